@@ -0,0 +1,72 @@
+"""
+Import-time budget for the entry points.
+
+    python -m benchmarks.bench_import_time            # table, exit 1 when over budget
+    python -m benchmarks.bench_import_time --runs 10
+
+Each entry point is imported in a fresh interpreter with ``-X importtime``;
+the median cumulative time of its top-level import is compared with its
+budget, and none of the modules in HEAVY may be pulled in on the way.
+"""
+import argparse, os, re, statistics, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry point -> budget in ms (cold-ish import on a dev machine, numpy and httpx included);
+# each at least a quarter above what it takes, so slower machines don't fail on noise
+BUDGETS_MS = {
+    "refactor_known_champ_pool_helper": 250,
+    "lol_api_tester": 150,
+    "main_champ_helper": 150,
+    "utils.recommend_daemon": 300,
+}
+# only imported on the code paths that need them
+HEAVY = ("riotwatcher", "bs4", "playwright", "selectolax", "requests_html")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """ (cumulative import time of ``module`` in ms, every module it imported) """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total, imported = None, set()
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        imported.add(m.group(4))
+        if m.group(4) == module and len(m.group(3)) == 1:
+            total = int(m.group(2)) / 1000
+    return total, imported
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check entry point import times against their budget")
+    ap.add_argument("--runs", type=int, default=5, help="Imports per entry point (median is used)")
+    ap.add_argument("modules", nargs="*", help="Entry points (default: all budgeted ones)")
+    args = ap.parse_args()
+
+    over = False
+    print(f"{'entry point':36} {'median ms':>10} {'budget':>8}  heavy imports")
+    for module in args.modules or BUDGETS_MS:
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module:36} {'-':>10} {'-':>8}  import failed: {e}   OVER")
+            over = True
+            continue
+        median = statistics.median(ms for ms, _ in runs)
+        heavy = sorted(m for m in runs[0][1] if m.split(".")[0] in HEAVY)
+        budget = BUDGETS_MS.get(module)
+        bad = heavy or (budget is not None and median > budget)
+        over |= bool(bad)
+        print(f"{module:36} {median:10.1f} {budget or '-':>8}  {', '.join(heavy) or '-'}"
+              f"{'   OVER' if bad else ''}")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
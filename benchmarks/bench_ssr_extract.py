@@ -0,0 +1,120 @@
+"""
+Compare the old per-character SSR scan with the raw_decode based
+extract_json_from_html on recorded u.gg pages, after checking that both,
+and SSRDocument, read the same data.
+
+    python -m benchmarks.bench_ssr_extract                 # every page in the html cache
+    python -m benchmarks.bench_ssr_extract page1.html ...  # specific pages
+"""
+import argparse, json, sys, time
+
+from utils.fetch_ugg import HTML_CACHE
+from utils.parse_ugg_ssr import extract_json_from_html
+from utils.ssr_document import SSRDocument
+
+SSR_KEY = "window.__SSR_DATA__"
+
+
+def legacy_extract_json_from_html(html: str, key: str) -> dict:
+    """ The original brace/quote tracking loop, kept as the baseline. """
+    start = html.find(key)
+    if start == -1:
+        raise RuntimeError(f"{key} not found")
+
+    start = html.find("{", start)
+    if start == -1:
+        raise RuntimeError(f"No opening brace after {key}")
+
+    brace_count = 0
+    in_str = False
+    escape = False
+
+    for i in range(start, len(html)):
+        c = html[i]
+        if c == '"' and not escape:
+            in_str = not in_str
+        elif not in_str:
+            if c == "{":
+                brace_count += 1
+            elif c == "}":
+                brace_count -= 1
+                if brace_count == 0:
+                    return json.loads(html[start:i + 1])
+        escape = (c == "\\" and not escape)
+
+    raise RuntimeError(f"No closing brace found for {key}")
+
+
+# layouts the lazy SSRDocument index must not get wrong: nested URL keys,
+# non-URL top level keys, scalar top level values, brackets inside strings
+MATCHUPS_URL = "https://stats2.u.gg/lol/1.5/matchups/15_9/ranked_solo_5x5/1/1.5.0.json"
+TRICKY_SSR = (
+    {"other": {MATCHUPS_URL: {"data": {}}}},
+    {"other": {"a": {"b": 1}, MATCHUPS_URL: {"data": {}}}, "https://x/champion.json": {"data": 1}},
+    {MATCHUPS_URL: {"data": {"s": "{[", "t": [1, {"u": "]}"}]}}, "version": 3, "w": {"x": "}"}},
+    {"a": {"b": {"c": {}}}, "d": [], 'e]},"q":': {"x": [[]]}, "f": {"z": '},"fake":{'}},
+    {},
+)
+
+
+def check_document(html: str, label: str):
+    """ SSRDocument must hold exactly what the full decode does. """
+    if dict(SSRDocument.from_html(html, SSR_KEY)) != extract_json_from_html(html, SSR_KEY):
+        sys.exit(f"{label}: SSRDocument disagrees with extract_json_from_html")
+
+
+def best_of(fn, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html, SSR_KEY)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def load_pages(paths: list[str]) -> list[tuple[str, str]]:
+    if paths:
+        return [(path, open(path, encoding="utf-8").read()) for path in paths]
+    pages = []
+    for key in sorted(HTML_CACHE.keys()):
+        data = HTML_CACHE.get(key)
+        if data is not None:
+            pages.append((key, data.decode("utf-8")))
+    return pages
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SSR extraction benchmark")
+    ap.add_argument("pages", nargs="*", help="Recorded u.gg pages (default: the html cache)")
+    ap.add_argument("--repeat", type=int, default=5, help="Runs per page, best is reported")
+    args = ap.parse_args()
+
+    for i, ssr in enumerate(TRICKY_SSR):
+        check_document(f"<script>{SSR_KEY} = {json.dumps(ssr)};</script>", f"tricky layout {i}")
+
+    pages = load_pages(args.pages)
+    if not pages:
+        sys.exit("no recorded pages found - run main_champ_helper.py once to fill ./cache")
+
+    total_old = total_new = 0.0
+    print(f"{'page':<50} {'size':>9} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}")
+    for path, html in pages:
+        if SSR_KEY not in html:
+            continue
+        if legacy_extract_json_from_html(html, SSR_KEY) != extract_json_from_html(html, SSR_KEY):
+            sys.exit(f"{path}: extractors disagree")
+        check_document(html, path)
+
+        old = best_of(legacy_extract_json_from_html, html, args.repeat)
+        new = best_of(extract_json_from_html, html, args.repeat)
+        total_old += old
+        total_new += new
+        print(f"{path[-50:]:<50} {len(html):>9} {old * 1000:>10.1f} {new * 1000:>8.1f} {old / new:>7.1f}x")
+
+    if total_new:
+        print(f"\ntotal: legacy {total_old * 1000:.1f} ms, new {total_new * 1000:.1f} ms "
+              f"({total_old / total_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+End to end benchmark of the helpers against recorded (or synthetic) pages
+served by a local stand-in, with per-stage timings, peak memory and a
+stored baseline to compare with.
+
+    python -m benchmarks.bench_suite                         # synthesises fixtures on first run
+    python -m benchmarks.bench_suite --latency 40 --repeat 5
+    python -m benchmarks.bench_suite --save-baseline         # write benchmarks/baseline.json
+    python -m benchmarks.bench_suite --only patch,names --json out.json
+
+Every run starts from an empty ./cache in a temp directory; "cold" stages
+clear the caches they depend on before each run. Exit status 1 when a
+stage is slower than the baseline by more than --tolerance.
+"""
+import argparse, json, os, platform, statistics, sys, tempfile, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixtures import FIXTURE_DIR, counter_pages, draft_sessions, manifest, synthesize
+from benchmarks.standin_server import StandInServer
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+TOLERANCE = 0.20     # slower than baseline by more than this is a regression
+NOISE_FLOOR_MS = 2.0  # ... unless it's only this much slower
+EXTRACT_PAGES = 20   # pages for the pure parsing stage
+PARSE_CHAMPIONS = 8  # counter pages per matchup parsing run
+WARM_LOOKUPS = 1000
+
+
+# --- cache resets ---------------------------------------------------------
+def _remove(*paths: str):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _clear(store):
+    for key in store.keys():
+        store.delete(key)
+    store.flush()
+
+
+def reset_patch():
+    from utils import patch
+    patch._patch_info = None
+    _remove(patch.PATCH_INFO_PATH)
+
+
+def reset_names():
+    from utils import champion_names
+    from utils.fetch_ugg import HTML_CACHE
+    champion_names._alias_index = None
+    _remove("./cache/champ_alias_map.json", "./cache/champ_alias_map.version", champion_names.ALIAS_INDEX_PATH)
+    _clear(HTML_CACHE)
+
+
+def reset_matchups():
+    import glob
+    from utils import matchup_tensor
+    from utils.fetch_ugg import CACHE_DIR, HTML_CACHE
+    from utils.parse_ugg_ssr import MATCHUP_CACHE
+    matchup_tensor._tensors.clear()
+    _remove(*glob.glob(os.path.join(CACHE_DIR, "tensor_*.npz")))
+    _clear(HTML_CACHE)
+    _clear(MATCHUP_CACHE)
+
+
+def expire_matchups():
+    """ Age every cached page and matchup list past CACHE_PERIOD (read stale-while-revalidate, as the daemon does). """
+    from utils.fetch_ugg import CACHE_PERIOD, HTML_CACHE, REVALIDATOR
+    from utils.parse_ugg_ssr import MATCHUP_CACHE
+    REVALIDATOR.drain()
+    for store in (HTML_CACHE, MATCHUP_CACHE):
+        store._age_entries_for_bench(CACHE_PERIOD + 1)
+
+
+# --- stages ---------------------------------------------------------------
+def build_stages(fixture_dir: str) -> dict[str, tuple]:
+    """ {stage name: (setup, run)}; setup is not timed. """
+    from main_champ_helper import get_best_blind_bans_as_champion
+    from utils.champion_names import get_champ_name_variations, load_champ_name_map
+    from utils.draft_engine import DraftEngine
+    from utils.lcu_watcher import diff_sessions
+    from utils.matchup_tensor import get_tensor
+    from utils.parse_ugg_ssr import SSR_KEY, extract_json_from_html, parse_ugg_matchups
+    from utils.patch import get_effective_patch
+
+    info = manifest(fixture_dir)
+    role = info["roles"][0]
+    pages = [html for _, html in counter_pages(fixture_dir, EXTRACT_PAGES)]
+    alias_map = load_champ_name_map()
+    by_slug = {entry["slug"]: entry for entry in alias_map.values()}
+    recorded = [by_slug[s] for s in info["champions"] if s in by_slug]
+    main_champ = next(e for e in recorded if e["slug"] != "aatrox")
+    inputs = [alias for entry in alias_map.values() for alias in entry["aliases"]]
+    inputs += [alias[:-1] for alias in inputs if len(alias) > 4]   # typos go through the fuzzy path
+
+    def resolve_names():
+        for text in inputs:
+            try:
+                get_champ_name_variations(text, alias_map)
+            except ValueError:
+                pass
+
+    def parse_matchups(stale: bool | None = None):
+        for entry in recorded[:PARSE_CHAMPIONS]:
+            parse_ugg_matchups(entry, role, stale=stale)
+
+    stages = {
+        "patch: resolve (cold)": (reset_patch, get_effective_patch),
+        f"patch: {WARM_LOOKUPS} warm lookups": (None, lambda: [get_effective_patch() for _ in range(WARM_LOOKUPS)]),
+        f"ssr: extract_json_from_html x{len(pages)}": (None, lambda: [extract_json_from_html(p, SSR_KEY) for p in pages]),
+        "names: load alias map (cold)": (reset_names, load_champ_name_map),
+        f"names: resolve {len(inputs)} inputs": (None, resolve_names),
+        f"matchups: parse {min(len(recorded), PARSE_CHAMPIONS)} pages (cold)": (reset_matchups, parse_matchups),
+        f"matchups: parse {min(len(recorded), PARSE_CHAMPIONS)} pages (warm)": (None, parse_matchups),
+        f"matchups: parse {min(len(recorded), PARSE_CHAMPIONS)} pages (expired)": (expire_matchups, lambda: parse_matchups(stale=True)),
+        f"main_champ_helper: blind bans {main_champ['name']} (cold)":
+            (reset_matchups, lambda: get_best_blind_bans_as_champion(main_champ["name"], role)),
+    }
+
+    registry = get_tensor().registry
+    ids = [registry.id_for_name(e["name"]) for e in recorded]
+    if len(ids) >= 14 and "top" in info["roles"]:
+        sessions = draft_sessions(ids)
+
+        def replay():
+            engine = DraftEngine([main_champ["name"], *(e["name"] for e in recorded[1:4])], "top")
+            previous = None
+            for session in sessions:
+                engine.apply_delta(diff_sessions(previous, session), session)
+                engine.recommend()
+                previous = session
+
+        stages[f"draft: replay {len(sessions)} champ select events"] = (None, replay)
+    else:
+        print("draft replay skipped: needs 14 recorded champions with top pages")
+    return stages
+
+
+def measure(setup, run, repeat: int, server: StandInServer) -> dict:
+    """ One untimed warm-up, ``repeat`` timed runs, then one run under tracemalloc. """
+    times = []
+    for k in range(repeat + 1):
+        if setup:
+            setup()
+        before = server.requests
+        t0 = time.perf_counter()
+        run()
+        if k:
+            times.append(time.perf_counter() - t0)
+        requests = server.requests - before
+    if setup:
+        setup()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000,
+            "peak_kb": peak / 1024, "requests": requests}
+
+
+# --- baseline -------------------------------------------------------------
+def compare(results: dict, baseline: dict | None) -> dict[str, float | None]:
+    """ {stage: relative change of the median vs baseline, None when not in it} """
+    changes = {}
+    for name, r in results.items():
+        old = (baseline or {}).get("stages", {}).get(name)
+        changes[name] = None if not old else r["median_ms"] / old["median_ms"] - 1
+    return changes
+
+
+def is_regression(result: dict, change: float | None, baseline_ms: float | None, tolerance: float) -> bool:
+    return change is not None and change > tolerance and result["median_ms"] - baseline_ms > NOISE_FLOOR_MS
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the helpers against a local u.gg stand-in")
+    ap.add_argument("--fixtures", default=FIXTURE_DIR, help="Fixture directory (synthesised when missing)")
+    ap.add_argument("--latency", type=float, default=20.0, help="Stand-in latency per request, ms")
+    ap.add_argument("--jitter", type=float, default=5.0, help="Random +- ms on top of the latency")
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (median is reported)")
+    ap.add_argument("--only", default="", help="Comma separated stage name prefixes, e.g. patch,names")
+    ap.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare with / save to")
+    ap.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    ap.add_argument("--json", help="Also write the results to this file")
+    args = ap.parse_args()
+    fixture_dir = os.path.abspath(args.fixtures)
+    baseline_path = os.path.abspath(args.baseline)
+    json_path = args.json and os.path.abspath(args.json)
+
+    server = StandInServer(fixture_dir, port=0, latency=args.latency / 1000, jitter=args.jitter / 1000).start()
+    os.environ.update(server.environ())   # before anything imports utils
+    os.chdir(tempfile.mkdtemp(prefix="lolbench-"))
+    if not os.path.exists(os.path.join(fixture_dir, "manifest.json")):
+        print(f"no fixtures in {fixture_dir}, synthesising...")
+        synthesize(fixture_dir)
+
+    stages = build_stages(fixture_dir)
+    only = [p.strip() for p in args.only.split(",") if p.strip()]
+    results = {}
+    for name, (setup, run) in stages.items():
+        if only and not any(name.startswith(p) for p in only):
+            continue
+        results[name] = measure(setup, run, args.repeat, server)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    changes = compare(results, baseline)
+
+    info = manifest(fixture_dir)
+    meta = {"created_at": time.time(), "python": platform.python_version(), "machine": platform.machine(),
+            "fixtures": info["source"], "patch": info["patch"], "latency_ms": args.latency,
+            "jitter_ms": args.jitter, "repeat": args.repeat}
+    if baseline and {k: baseline["meta"].get(k) for k in ("fixtures", "latency_ms")} != \
+            {k: meta[k] for k in ("fixtures", "latency_ms")}:
+        print(f"note: baseline was taken with {baseline['meta'].get('fixtures')} fixtures at "
+              f"{baseline['meta'].get('latency_ms')} ms latency")
+
+    regressed = False
+    print(f"\n{'stage':52} {'median ms':>10} {'min ms':>9} {'peak KB':>9} {'reqs':>5} {'baseline':>9} {'change':>8}")
+    for name, r in results.items():
+        old = (baseline or {}).get("stages", {}).get(name)
+        bad = is_regression(r, changes[name], old and old["median_ms"], args.tolerance)
+        regressed |= bad
+        change = "-" if changes[name] is None else f"{changes[name]:+.0%}"
+        before = f"{old['median_ms']:.1f}" if old else "-"
+        print(f"{name[:52]:52} {r['median_ms']:10.1f} {r['min_ms']:9.1f} {r['peak_kb']:9.0f} {r['requests']:5} "
+              f"{before:>9} {change:>8}{'  REGRESSION' if bad else ''}")
+
+    report = {"meta": meta, "stages": results}
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({**report, "changes": changes}, f, indent=2)
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nbaseline saved to {baseline_path}")
+    server.shutdown()
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Fixtures for the benchmark suite: the pages the helpers download, on disk.
+
+    python -m benchmarks.fixtures synth                       # generated, no network
+    python -m benchmarks.fixtures synth --champions 80 --page-kb 900
+    python -m benchmarks.fixtures record --roles top,mid      # champion_pool.txt from the real sites
+
+Layout of a fixture directory:
+
+    manifest.json          source, patch, champions (slugs), roles
+    versions.json          Data Dragon versions list
+    champion.json          Data Dragon champion data of the latest patch
+    patch_schedule.html    Riot's patch schedule page
+    counter/<slug>_<role>.html.gz   u.gg counter pages (role "norole" = no role param)
+
+Synthetic pages have the same SSR layout as the real ones (champion.json,
+SEO names, rankings and matchups blocks), padded with a filler block to a
+realistic size.
+"""
+import argparse, gzip, json, os, pathlib, random, time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+CHAMPSELECT_EXAMPLE = os.path.join(ROOT, "data_examples", "champselect.py")
+SYNTH_VERSIONS = ["15.10.1", "15.9.1", "15.8.1", "lolpatch_7.20"]
+SYNTH_PAGE_KB = 600   # real counter pages are 0.5-1 MB of html
+
+# a real slice of the champion list, so aliases look like the real ones
+SYNTH_CHAMPIONS = [
+    (266, "Aatrox", "Aatrox"), (103, "Ahri", "Ahri"), (84, "Akali", "Akali"), (166, "Akshan", "Akshan"),
+    (12, "Alistar", "Alistar"), (32, "Amumu", "Amumu"), (34, "Anivia", "Anivia"), (1, "Annie", "Annie"),
+    (523, "Aphelios", "Aphelios"), (22, "Ashe", "Ashe"), (136, "AurelionSol", "Aurelion Sol"),
+    (268, "Azir", "Azir"), (432, "Bard", "Bard"), (53, "Blitzcrank", "Blitzcrank"), (63, "Brand", "Brand"),
+    (201, "Braum", "Braum"), (51, "Caitlyn", "Caitlyn"), (164, "Camille", "Camille"),
+    (69, "Cassiopeia", "Cassiopeia"), (31, "Chogath", "Cho'Gath"), (42, "Corki", "Corki"),
+    (122, "Darius", "Darius"), (131, "Diana", "Diana"), (36, "DrMundo", "Dr. Mundo"), (119, "Draven", "Draven"),
+    (245, "Ekko", "Ekko"), (60, "Elise", "Elise"), (28, "Evelynn", "Evelynn"), (81, "Ezreal", "Ezreal"),
+    (9, "Fiddlesticks", "Fiddlesticks"), (114, "Fiora", "Fiora"), (105, "Fizz", "Fizz"), (3, "Galio", "Galio"),
+    (41, "Gangplank", "Gangplank"), (86, "Garen", "Garen"), (150, "Gnar", "Gnar"), (79, "Gragas", "Gragas"),
+    (104, "Graves", "Graves"), (887, "Gwen", "Gwen"), (120, "Hecarim", "Hecarim"),
+]
+
+
+def counter_file(slug: str, role: str | None) -> str:
+    return os.path.join("counter", f"{slug.lower()}_{role or 'norole'}.html.gz")
+
+
+def manifest(fixture_dir: str = FIXTURE_DIR) -> dict:
+    with open(os.path.join(fixture_dir, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def counter_pages(fixture_dir: str = FIXTURE_DIR, limit: int | None = None) -> list[tuple[str, str]]:
+    """ [(file name, html), ...] of the recorded counter pages (the first ``limit``) """
+    pages = []
+    for path in sorted(pathlib.Path(fixture_dir, "counter").glob("*.html.gz"))[:limit]:
+        pages.append((path.name, gzip.decompress(path.read_bytes()).decode("utf-8")))
+    return pages
+
+
+def _write(fixture_dir: str, name: str, data: bytes | str):
+    path = os.path.join(fixture_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(data, mtime=0) if name.endswith(".gz") else data)
+
+
+# --- synthetic ------------------------------------------------------------
+def _ssr_page(me: int, champs: list[tuple[int, str, str]], patch: str, filler: str, rng: random.Random) -> str:
+    from utils.fetch_ugg import ROLES
+    tag = "_".join(patch.split(".")[:2])
+    champion_json = {key: {"key": str(cid), "id": key, "name": name} for cid, key, name in champs}
+    seo = {str(cid): {"name": name, "altName": key.lower()[:4]} for cid, key, name in champs}
+    rankings = {f"world_emerald_plus_{role}": {"roleMatches": rng.randint(0, 60000),
+                                               "pick_rate": round(rng.uniform(0, 12), 2)} for role in ROLES}
+    counters = {f"world_emerald_plus_{role}": {"counters": [
+        {"champion_id": cid, "win_rate": round(rng.gauss(50, 3), 2), "gold_adv_15": round(rng.gauss(0, 300), 1),
+         "pick_rate": round(rng.uniform(0, 10), 2), "matches": rng.randint(50, 20000)}
+        for cid, _, _ in champs if cid != me]} for role in ROLES}
+    ssr = {
+        f"https://static.bigbrain.gg/assets/lol/riot_static/{patch}/data/en_US/champion.json": {"data": champion_json},
+        "https://static.bigbrain.gg/assets/lol/seo-champion-names.json": {"data": seo},
+        f"rankings_emerald_plus_world::https://stats2.u.gg/lol/1.5/rankings/{tag}/ranked_solo_5x5/{me}/1.5.0.json":
+            {"data": rankings},
+        f"https://stats2.u.gg/lol/1.5/matchups/{tag}/ranked_solo_5x5/{me}/1.5.0.json": {"data": counters},
+        "https://static.bigbrain.gg/assets/ugg/filler.json": {"data": filler},
+    }
+    return ("<!DOCTYPE html><html><head><title>counters</title></head><body><div id=\"root\"></div>"
+            f"<script>window.__SSR_DATA__ = {json.dumps(ssr)};</script></body></html>")
+
+
+def synthesize(fixture_dir: str = FIXTURE_DIR, champions: int = len(SYNTH_CHAMPIONS),
+               page_kb: int = SYNTH_PAGE_KB, seed: int = 7):
+    """ A self consistent fixture set: every champion's page in every role. """
+    from utils.fetch_ugg import ROLES
+    from utils.patch import convert_to_client_version
+    rng = random.Random(seed)
+    champs = SYNTH_CHAMPIONS[:champions]
+    champs += [(1000 + i, f"Synth{i}", f"Synth {i}") for i in range(champions - len(champs))]
+    patch = SYNTH_VERSIONS[0]
+    filler = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(page_kb * 1024))
+
+    _write(fixture_dir, "versions.json", json.dumps(SYNTH_VERSIONS))
+    _write(fixture_dir, "champion.json", json.dumps(
+        {"type": "champion", "version": patch,
+         "data": {key: {"key": str(cid), "id": key, "name": name} for cid, key, name in champs}}))
+    today = datetime.now()
+    rows = "".join(f"<tr><td>{convert_to_client_version(v)}</td><td>{today - timedelta(days=10 + 14 * k):%B %d, %Y}</td></tr>"
+                   for k, v in enumerate(SYNTH_VERSIONS[:3]))
+    _write(fixture_dir, "patch_schedule.html",
+           f"<html><body><h1>Patch Schedule</h1><table><tr><th>Patch</th><th>Date</th></tr>{rows}</table></body></html>")
+    for cid, key, _ in champs:
+        for role in (None, *ROLES):
+            _write(fixture_dir, counter_file(key, role), _ssr_page(cid, champs, patch, filler, rng))
+    _write(fixture_dir, "manifest.json", json.dumps({
+        "source": "synthetic", "created_at": time.time(), "patch": patch,
+        "champions": [key.lower() for _, key, _ in champs], "roles": list(ROLES)}, indent=2))
+
+
+# --- recorded -------------------------------------------------------------
+def record(fixture_dir: str = FIXTURE_DIR, champions: list[str] = (), roles=("top",)):
+    """ Download the real pages through the regular fetch code (needs the network). """
+    from utils import http_client
+    from utils.champion_registry import DDRAGON_CHAMPIONS_URL
+    from utils.fetch_ugg import fetch_champ_counter_ugg
+    from utils.patch import HEADERS, PATCH_META_URL, PATCH_SCHEDULE_URL, get_current_patch
+
+    _write(fixture_dir, "versions.json", http_client.get(PATCH_META_URL, headers=HEADERS).text)
+    _write(fixture_dir, "patch_schedule.html", http_client.get(PATCH_SCHEDULE_URL, headers=HEADERS).text)
+    patch = get_current_patch()
+    _write(fixture_dir, "champion.json",
+           http_client.get(DDRAGON_CHAMPIONS_URL.format(patch=patch), headers=HEADERS).text)
+    slugs = sorted({"aatrox", *(c.lower() for c in champions)})   # aatrox: the alias map's page
+    for slug in slugs:
+        for role in (None, *roles):
+            print(f"recording {slug} {role or '-'}")
+            _write(fixture_dir, counter_file(slug, role), fetch_champ_counter_ugg(slug, role))
+    _write(fixture_dir, "manifest.json", json.dumps({
+        "source": "recorded", "created_at": time.time(), "patch": patch,
+        "champions": slugs, "roles": list(roles)}, indent=2))
+
+
+# --- champ select ---------------------------------------------------------
+def draft_sessions(champion_ids: list[int], template_path: str = CHAMPSELECT_EXAMPLE,
+                   picks: int = 5, seed: int = 7) -> list[dict]:
+    """
+    A pick by pick champ select built on the recorded session: both teams
+    filled to five, then bans and picks land one event at a time.
+    """
+    from utils.lcu_mock import load_sessions
+    rng = random.Random(seed)
+    base = load_sessions(template_path)[-1]
+    chosen = rng.sample(champion_ids, 2 * picks + 4)
+    ally_template = base["myTeam"][0]
+    session = json.loads(json.dumps(base))
+    session["myTeam"] = [{**ally_template, "cellId": c, "championId": 0,
+                          "assignedPosition": "top" if c == session["localPlayerCellId"] else ""}
+                         for c in range(picks)]
+    session["theirTeam"] = [{"cellId": picks + c, "championId": 0, "team": 2} for c in range(picks)]
+    session["bans"] = {"myTeamBans": [], "theirTeamBans": [], "numBans": 4}
+    sessions = [json.loads(json.dumps(session))]
+
+    events = [("bans", "myTeamBans", chosen[0]), ("bans", "theirTeamBans", chosen[1]),
+              ("bans", "myTeamBans", chosen[2]), ("bans", "theirTeamBans", chosen[3])]
+    for k in range(picks):
+        events += [("theirTeam", k, chosen[4 + k]), ("myTeam", k, chosen[4 + picks + k])]
+    for team, slot, champ in events:
+        if team == "bans":
+            session["bans"][slot].append(champ)
+        else:
+            session[team][slot]["championId"] = champ
+        sessions.append(json.loads(json.dumps(session)))
+    return sessions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Create benchmark fixtures")
+    sub = ap.add_subparsers(dest="command", required=True)
+    synth = sub.add_parser("synth", help="Generate synthetic fixtures (no network)")
+    synth.add_argument("--champions", type=int, default=len(SYNTH_CHAMPIONS))
+    synth.add_argument("--page-kb", type=int, default=SYNTH_PAGE_KB, help="Filler per page")
+    rec = sub.add_parser("record", help="Record the real pages")
+    rec.add_argument("--pool", default=os.path.join(ROOT, "champion_pool.txt"),
+                     help="Champions to record, one per line")
+    rec.add_argument("--roles", default="top", help="Comma separated roles")
+    ap.add_argument("--dir", default=FIXTURE_DIR, help="Fixture directory")
+    args = ap.parse_args()
+
+    if args.command == "synth":
+        synthesize(args.dir, args.champions, args.page_kb)
+    else:
+        from utils.champion_names import get_champ_name_variations, load_champ_name_map
+        alias_map = load_champ_name_map()
+        slugs = [get_champ_name_variations(c.strip(), alias_map)["slug"]
+                 for c in pathlib.Path(args.pool).read_text().splitlines() if c.strip()]
+        record(args.dir, slugs, tuple(r.strip() for r in args.roles.split(",") if r.strip()))
+    m = manifest(args.dir)
+    print(f"{args.dir}: {m['source']}, patch {m['patch']}, {len(m['champions'])} champions, "
+          f"{len(list(pathlib.Path(args.dir, 'counter').glob('*.html.gz')))} counter pages")
+
+
+if __name__ == "__main__":
+    main()
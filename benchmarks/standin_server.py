@@ -0,0 +1,131 @@
+"""
+Local stand-in for u.gg, Data Dragon and the patch schedule page, serving
+a fixture directory (benchmarks.fixtures) with configurable latency.
+
+    python -m benchmarks.standin_server --latency 40 --jitter 10
+    UGG_BASE_URL=http://127.0.0.1:8790 DDRAGON_BASE_URL=http://127.0.0.1:8790 \\
+        PATCH_SCHEDULE_URL=http://127.0.0.1:8790/patch-schedule python refactor_known_champ_pool_helper.py
+
+Counter pages are sent gzip encoded when the client accepts it, like the
+real sites do. Unknown champions get 404; a role without a recording
+falls back to the champion's no-role page.
+"""
+import argparse, gzip, os, random, re, threading, time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import FIXTURE_DIR, counter_file
+
+DEFAULT_PORT = 8790
+SCHEDULE_PATH = "/patch-schedule"
+
+_COUNTER = re.compile(r"^/lol/champions/([\w.-]+)/counter$")
+_CHAMPION_JSON = re.compile(r"^/cdn/[\w.]+/data/en_US/champion\.json$")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: "StandInServer"
+    protocol_version = "HTTP/1.1"   # keep-alive, like the pooled client expects
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/api/versions.json":
+            name = "versions.json"
+        elif _CHAMPION_JSON.match(url.path):
+            name = "champion.json"
+        elif url.path == SCHEDULE_PATH:
+            name = "patch_schedule.html"
+        elif m := _COUNTER.match(url.path):
+            role = parse_qs(url.query).get("role", [None])[0]
+            name = counter_file(m.group(1), role)
+            if not os.path.exists(os.path.join(self.server.fixture_dir, name)):
+                name = counter_file(m.group(1), None)
+        else:
+            name = None
+        self.server.wait()
+
+        body = self.server.read(name) if name else None
+        if body is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        compressed = name.endswith(".gz")
+        if compressed and "gzip" not in self.headers.get("Accept-Encoding", ""):
+            body, compressed = gzip.decompress(body), False
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json" if name.endswith(".json") else "text/html; charset=utf-8")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixture_dir: str = FIXTURE_DIR, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 latency: float = 0.0, jitter: float = 0.0):
+        """ latency and jitter in seconds, added to every response """
+        super().__init__((host, port), StandInHandler)
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._files: dict[str, bytes | None] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self) -> dict[str, str]:
+        """ Variables that point the helpers at this server; set them before importing utils. """
+        return {"UGG_BASE_URL": self.url, "DDRAGON_BASE_URL": self.url,
+                "PATCH_SCHEDULE_URL": self.url + SCHEDULE_PATH}
+
+    def wait(self):
+        with self._lock:
+            self.requests += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self, name: str) -> bytes | None:
+        """ Fixture file contents, kept in memory after the first read. """
+        if name not in self._files:
+            try:
+                with open(os.path.join(self.fixture_dir, name), "rb") as f:
+                    self._files[name] = f.read()
+            except OSError:
+                self._files[name] = None
+        return self._files[name]
+
+    def start(self) -> "StandInServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve benchmark fixtures as u.gg / Data Dragon")
+    ap.add_argument("--dir", default=FIXTURE_DIR, help="Fixture directory")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every response")
+    ap.add_argument("--jitter", type=float, default=0.0, help="Random +- milliseconds on top")
+    args = ap.parse_args()
+
+    server = StandInServer(args.dir, port=args.port, latency=args.latency / 1000, jitter=args.jitter / 1000)
+    for name, value in server.environ().items():
+        print(f"{name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
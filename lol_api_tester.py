@@ -1,65 +1,53 @@
 import argparse, pathlib, sys
-import base64
-
-import urllib3
-from riotwatcher import LolWatcher, RiotWatcher, ApiError
-import requests
+from functools import cache
 import json
 
+from utils import http_client
+from utils.champion_registry import get_registry
+from utils.lcu import get_lcu_client
 
 
-def get_local_champ_select():
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-    # Path to the lockfile
-    lockfile_path = 'D:/Games/Riot Games/League of Legends/lockfile'
-
-    # Read and parse the lockfile
-    with open(lockfile_path, 'r') as f:
-        content = f.read().split(':')
-        port = content[2]
-        password = content[3]
-
-    # Construct the authorization header
-    auth_token = base64.b64encode(f'riot:{password}'.encode()).decode()
-    headers = {
-        'Authorization': f'Basic {auth_token}'
-    }
 
-    # Construct the URL using the dynamic port
-    url = f'https://127.0.0.1:{port}/lol-champ-select/v1/session'
-
-    # Make the GET request
+def get_local_champ_select():
+    # One kept-alive connection to the client, lockfile read once
     try:
-        response = requests.get(url, headers=headers, verify=False)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Failed to fetch data: {response.status_code}")
-    except requests.exceptions.RequestException as e:
+        return get_lcu_client().champ_select_session()
+    except (OSError, http_client.HTTPError) as e:
         print(f"Error: {e}")
 
 
 def champ_id_to_name(champ_id):
-    # Get the champion data
-    champions = lol_watcher.data_dragon.champions('13.19.1')
-    # Find the champion name by ID
-    for champ in champions['data'].values():
-        if int(champ['key']) == champ_id:
-            return champ['name']
-    return None
+    return get_registry().name(champ_id)
 
 
 ign = "Slavvy"  # Summoner name (before the '#')
 tag_line = "SLAV"  # Region tag (e.g., EUW, NA1, etc.)
 my_region = 'euw1'
-api_key = open('riot_api_key.env').read().strip()
-lol_watcher = LolWatcher(api_key)
-riot_watcher = RiotWatcher(api_key)
+API_KEY_PATH = 'riot_api_key.env'
+
+
+# Riot API clients are only built for the calls that need them, so the
+# counterpick CLI runs without riotwatcher or an API key file.
+@cache
+def get_api_key() -> str:
+    with open(API_KEY_PATH) as f:
+        return f.read().strip()
+
+
+@cache
+def get_lol_watcher():
+    from riotwatcher import LolWatcher
+    return LolWatcher(get_api_key())
+
+
+@cache
+def get_riot_watcher():
+    from riotwatcher import RiotWatcher
+    return RiotWatcher(get_api_key())
 
 
 def api_shenanigans():
-    account_info = riot_watcher.account.by_riot_id("europe", ign, tag_line)
+    account_info = get_riot_watcher().account.by_riot_id("europe", ign, tag_line)
 
     puuid = account_info['puuid']
     assert puuid != None
@@ -67,21 +55,16 @@ def api_shenanigans():
 
 def get_champs_in_teams_in_local_champ_select():
     champ_select_info = get_local_champ_select()
-    # for each team
-    latest_version = lol_watcher.data_dragon.versions_for_region(my_region)['n']['champion']
-    champion_data = requests.get(
-        f'https://ddragon.leagueoflegends.com/cdn/{latest_version}/data/en_US/champion.json'
-    ).json()['data']
-    champ_id_to_name = {int(info['key']): name for name, info in champion_data.items()}
+    registry = get_registry()
 
 
-    # champs already cached in champ_id_to_name
+    # champs already cached in the registry
     my_team_ids    = [p['championId'] for p in champ_select_info.get('myTeam', [])]
     their_team_ids = [p['championId'] for p in champ_select_info.get('theirTeam', [])]
 
     # ignore empty (0 = not locked yet)
-    my_team_names    = [champ_id_to_name.get(cid) for cid in my_team_ids if cid]
-    their_team_names = [champ_id_to_name.get(cid) for cid in their_team_ids if cid]
+    my_team_names    = [registry.name(cid) for cid in my_team_ids if cid]
+    their_team_names = [registry.name(cid) for cid in their_team_ids if cid]
 
     # print("Ally: ", my_team_names)
     # print("Enemy:", their_team_names)
@@ -127,16 +110,28 @@ def get_roles_playrate(champ_ugg, role):
     return champ_ugg["data"].get(bucket, {}).get("roleMatches", 0) / total
 
 
-# foreach champ in my_team_champs:
-# fetch ugg data for champ
-# get role playrate for each role for champ
-# tell the user which champion is most likely to be played in which role
-# return dict with likeliest role:champ pairings
-# todo?
-def estimate_enemy_team_roles():
-    return
-    # enemyTeam = get_champs_in_teams_in_local_champ_select().enemyChamps
-
+def estimate_enemy_team_roles(enemy_champs: list[str] | None = None) -> dict[str, str]:
+    """
+    {role: champion name} for the enemy team (default: the live champ select),
+    the most likely way the picks split over the five roles given how often
+    each champion plays each role this patch (see utils.role_meta). Empty
+    until that table has been built - building it is ~170 page fetches, too
+    slow for champ select.
+    """
+    from utils.role_meta import assign_roles, get_role_meta   # numpy, only for this
+
+    if enemy_champs is None:
+        enemy_champs = get_champs_in_teams_in_local_champ_select()['enemyChamps']
+    registry = get_registry()
+    indices = [i for i in (registry.index_for_name(n) for n in enemy_champs) if i >= 0]
+    if not indices:
+        return {}
+    meta = get_role_meta(build=False)
+    if meta is None:
+        print("No role meta for this patch yet (build it with `python -m utils.role_meta`)")
+        return {}
+    roles = assign_roles(meta, indices)
+    return {role: registry.names[i] for role, i in roles.items()}
 
 
 #
@@ -179,21 +174,5 @@ def estimate_enemy_team_roles():
 #
 
 if __name__ == "__main__":
-    enemy_champs = get_champs_in_teams_in_local_champ_select().enemyChamps
-#     print enemy champs+ assign each a number 1 to 5
-    for i, champ in enumerate(enemy_champs, start=1):
-        print(f"{i}. {champ}")
-#  ask user to pick a number of who they think is the enemy laner
-    print("Pick a number for the enemy laner:")
-    try:
-        choice = int(input())
-        if 1 <= choice <= len(enemy_champs):
-            enemy_laner = enemy_champs[choice - 1]
-        else:
-            print("Invalid choice. Please pick a number from the list.")
-    except ValueError:
-        print("Invalid input. Please enter a number.")
-
-
-
-
+    for role, champ in estimate_enemy_team_roles().items():
+        print(f"{role:8} {champ}")
@@ -1,16 +1,9 @@
-import time, os, json, hashlib, requests
-import httpx
-from selectolax.parser import HTMLParser
+import time, os, json, hashlib
 from pathlib import Path
 from typing import Dict, Tuple, List, FrozenSet
-from playwright.sync_api import sync_playwright
-import time
-
-import httpx
 
+from utils import http_client
 from utils.fetch_ugg import HEADERS
-from utils.parse_ugg_ssr import extract_json_from_html, parse_ugg_matchups
-from requests_html import HTMLSession
 
 def get_global_pickrates(ssr: dict) -> dict[int, float]:
     """champ-id -> global pick-rate across all roles (emerald+)."""
@@ -21,59 +14,29 @@ def get_global_pickrates(ssr: dict) -> dict[int, float]:
     return {}
 
 def get_role_meta_pickrates(role: str) -> dict[str, float]:
-    url = f"https://u.gg/lol/champions/aatrox/counter?rank=emerald_plus&role={role}"
-    ssr = extract_json_from_html(url, "window.__SSR_DATA__")
-
-    # champ-id  →  name
-    id2name = next(
-        blk["data"]                            # safe: this block is always a dict
-        for u, blk in ssr.items() if "seo-champion-names.json" in u
-    )
-    id2name = {int(cid): info["name"].lower() for cid, info in id2name.items()}
-
-    global_pk = get_global_pickrates(ssr)      # as in the previous message
-    role_pk   = {}
-
-    role_key = f"world_emerald_plus_{role.lower()}"
-
-    for blk in ssr.values():
-        if not isinstance(blk, dict):          # ← **skip list blocks**
-            continue
-        data_section = blk.get("data")
-        if not isinstance(data_section, dict):
-            continue
-        rdata = data_section.get(role_key)
-        if not isinstance(rdata, dict):
-            continue
-
-        for c in rdata.get("counters", []):
-            cid = c["champion_id"]
-            role_pk[id2name[cid]] = c.get("pick_rate", 0.0)
-        break                                  # we found the block, stop looping
-
-    # fall-back to global pick-rate when lane pick-rate is zero / missing
-    return {name: (role_pk.get(name, 0.0) or global_pk.get(cid, 0.0))
-            for cid, name in id2name.items()}
+    """champ name (lower) -> pick-rate in ``role``, from one reference counter page per role."""
+    from utils.ban_planner import meta_pickrates   # numpy, only for the ban helpers
+    from utils.matchup_tensor import get_tensor, save_tensor
+    tensor = get_tensor()
+    rates = meta_pickrates(tensor, role)
+    save_tensor(tensor)
+    return {name.lower(): float(pk) for name, pk in zip(tensor.registry.names, rates)}
 
 
 # --------------------------------------------------------------------
 def get_best_blind_bans_as_champion(main_champ: str,
                                     role: str,
                                     count: int = 5) -> list[tuple[str,float,float]]:
-    """(champ, my WR vs them, THEIR global pick-rate)"""
-    counters   = parse_ugg_matchups(main_champ, role)
-    pickrates  = get_role_meta_pickrates(role)          # use new function above
-
-    bad = []
-    for enemy, stats in counters.items():
-        wr = stats["wr"]                # ← already our win-rate vs them
-        pk = pickrates.get(enemy.lower(), 0.0)
-        if wr > 50 and pk:              # ignore fringe picks completely
-            score = (50 - wr) + pk*0.6  # tweak weight as you like
-            bad.append((enemy.title(), wr, pk, score))
-
-    bad.sort(key=lambda x: -x[3])
-    return [(e, wr, pk) for e, wr, pk, _ in bad[:count]]
+    """(champ, THEIR WR vs main_champ, their pick-rate in role) -- see utils.ban_planner for whole pools"""
+    from utils.ban_planner import plan_bans
+    from utils.matchup_tensor import get_tensor, save_tensor
+    tensor = get_tensor()
+    plan = plan_bans(tensor, [main_champ], (role,), min_matches=0)
+    save_tensor(tensor)
+    pick = tensor.registry.index_for_name(main_champ)
+    if pick < 0:
+        raise ValueError(f"Champion '{main_champ}' not recognized")
+    return [(enemy, wr, pk) for enemy, _, wr, pk, _ in plan.for_pick(pick, role, count)]
 
 
 
@@ -82,6 +45,8 @@ ROLES = ["top-lane", "jungle", "mid-lane", "adc", "support"]
 
 
 def scrape_ugg_tiers():
+        from playwright.sync_api import sync_playwright   # a browser is only needed here
+
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
@@ -96,7 +61,7 @@ def scrape_ugg_tiers():
             browser.close()
 
             if real_data_url:
-                response = requests.get(real_data_url, headers={
+                response = http_client.get(real_data_url, headers={
                     "User-Agent": "Mozilla/5.0",
                     "Referer": "https://u.gg/"
                 })
@@ -1,9 +1,14 @@
 import argparse, pathlib, sys
 from tabulate import tabulate
 
-from lol_api_tester import get_champs_in_teams_in_local_champ_select
-from utils.parse_ugg_ssr import parse_ugg_matchups
+from utils.matchup_tensor import get_tensor, save_tensor
+from utils.team_scoring import (load_enemies, score_pool_vs_team, scored_enemies,
+                                LANE_WEIGHT, TEAM_WEIGHT, LATENCY_BUDGET)
 from utils.champion_names import load_champ_name_map, get_champ_name_variations
+from utils.fetch_ugg import normalize_role
+from utils.parse_ugg_ssr import DEFAULT_RANK
+from utils.batch import BatchRunner, read_queries, write_results
+from utils.profiling import add_profile_argument, profile_from_args
 
 CACHE_BOOL = True  # change if needed
 
@@ -14,24 +19,34 @@ def get_user_champ_pool(path: pathlib.Path) -> frozenset[str]:
 
 
 def main():
-    CHAMP_NAME_MAP = load_champ_name_map()
     args = argParser()
-    enemy = args.enemy
+    if args.snapshot:
+        from utils.snapshot import use_snapshot
+        use_snapshot(args.snapshot)
+    CHAMP_NAME_MAP = load_champ_name_map()
+
+    if args.batch:
+        batchMain(args, CHAMP_NAME_MAP)
+        return
 
+    if args.team:
+        teamPickMain(args, CHAMP_NAME_MAP)
+        return
 
-    if not enemy:
+    if args.enemy:
+        enemy = get_champ_name_variations(args.enemy, CHAMP_NAME_MAP)
+    else:
         # enemy = get_champ_name_variations(input("Enemy champion: ").strip(), CHAMP_NAME_MAP)
-        enemy = get_champ_name_variations(getEnemyLaner().strip(), CHAMP_NAME_MAP)
+        enemy = get_champ_name_variations(getEnemyLaner(args.role).strip(), CHAMP_NAME_MAP)
 
 
     pool = get_user_champ_pool(pathlib.Path(args.pool))
 
-    matchup_data = parse_ugg_matchups(enemy, args.role)
+    tensor = get_tensor(args.rank)
+    enemy_index = tensor.ensure(enemy, args.role, use_cache=CACHE_BOOL)
+    save_tensor(tensor)
 
-    filtered = [
-        (champ, data["wr"], data["gd15"],data["matches"]) for champ, data in matchup_data.items()
-        if champ.lower() in pool
-    ]
+    filtered = tensor.best_vs(enemy_index, args.role, tensor.indices(pool))
 
     enemy_name = enemy["name"]
     if not filtered:
@@ -46,10 +61,94 @@ def argParser():
     ap.add_argument("--enemy", required=False, help="Enemy champion name")
     ap.add_argument("--role", default="top", help="Role (default: top)")
     ap.add_argument("--pool", default="champion_pool.txt", help="Path to your champion pool file")
+    ap.add_argument("--team", action="store_true",
+                    help="Score your pool against the whole enemy team (--enemy becomes the lane opponent)")
+    ap.add_argument("--enemies", help="Comma separated enemy team for --team (default: live champ select)")
+    ap.add_argument("--lane-weight", type=float, default=LANE_WEIGHT, help="Weight of the lane opponent")
+    ap.add_argument("--team-weight", type=float, default=TEAM_WEIGHT, help="Weight shared by the other enemies")
+    ap.add_argument("--budget", type=float, default=LATENCY_BUDGET,
+                    help="Seconds to wait for uncached enemy data")
+    ap.add_argument("--rank", default=DEFAULT_RANK, help=f"u.gg rank filter (default: {DEFAULT_RANK})")
+    ap.add_argument("--batch", metavar="FILE",
+                    help="Answer every JSONL query in FILE ('-' for stdin); --role/--pool/--rank are defaults")
+    ap.add_argument("--snapshot", metavar="FILE",
+                    help="Answer offline from a bundle made with `python -m utils.snapshot export`")
+    ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Batch output format")
+    ap.add_argument("--output", metavar="FILE", help="Batch output file (default: stdout)")
+    add_profile_argument(ap)
     args = ap.parse_args()
+    profile_from_args(args)
     return args
 
 
+def batchMain(args, champ_name_map):
+    runner = BatchRunner(champ_name_map, args.role, args.pool, args.rank,
+                         args.lane_weight, args.team_weight, use_cache=CACHE_BOOL)
+    source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        write_results(runner.run(read_queries(source)), out, args.format)
+    except ValueError as e:
+        sys.exit(f"batch: {e}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+def teamPickMain(args, champ_name_map):
+    if args.enemies:
+        enemy_names = [n for n in args.enemies.split(",") if n.strip()]
+    else:
+        from lol_api_tester import get_champs_in_teams_in_local_champ_select
+        enemy_names = get_champs_in_teams_in_local_champ_select()['enemyChamps']
+    if not enemy_names:
+        print("No enemy champions to score against yet.")
+        return
+
+    enemies = [get_champ_name_variations(n.strip(), champ_name_map) for n in enemy_names]
+    if args.enemy:
+        lane = get_champ_name_variations(args.enemy, champ_name_map)
+    else:
+        from lol_api_tester import estimate_enemy_team_roles
+        laner = estimate_enemy_team_roles([e["name"] for e in enemies]).get(normalize_role(args.role))
+        lane = get_champ_name_variations(laner, champ_name_map) if laner else None
+    if lane and lane not in enemies:
+        enemies.append(lane)
+    pool = get_user_champ_pool(pathlib.Path(args.pool))
+
+    tensor = get_tensor(args.rank)
+    enemy_indices = load_enemies(tensor, enemies, args.role, args.budget, use_cache=CACHE_BOOL)
+    save_tensor(tensor)
+    lane_index = tensor.registry.index_for_slug(lane["slug"]) if lane else None
+
+    ranked = score_pool_vs_team(tensor, tensor.indices(pool), enemy_indices, args.role,
+                                lane_index, args.lane_weight, args.team_weight)
+    if not ranked:
+        print("None of your champions have matchup data against this team.")
+        return
+
+    printTeamScoreSummary(args, [e["name"] for e in enemies], lane, ranked)
+
+    others = [i for i in enemy_indices if i != lane_index]
+    scored = scored_enemies(tensor, tensor.indices(pool), enemy_indices, args.role, lane_index)
+    if len(scored) < len(others):
+        missing = [tensor.registry.names[i] for i in others if i not in scored]
+        print(f"\nTeam WR uses {len(scored)} of {len(others)} other enemies "
+              f"(no {args.role} matchup data vs your pool for {', '.join(missing)})")
+
+
+def printTeamScoreSummary(args, enemy_names, lane, ranked):
+    lane_note = f", lane: {lane['name']}" if lane else ""
+    print(f"\nBest picks **from your pool** vs {', '.join(enemy_names)} ({args.role}{lane_note})\n")
+    print(tabulate(
+        ranked,
+        headers=["Champion", "Score (weighted WR %)", "Lane WR %", "Team WR %", "Matches"],
+        floatfmt=".2f"
+    ))
+
+
 def printPoolWinrateSummary(args, enemy_name, filtered):
     print(f"\nBest picks **from your pool** vs {enemy_name} ({args.role})\n")
     print(tabulate(
@@ -59,8 +158,14 @@ def printPoolWinrateSummary(args, enemy_name, filtered):
     ))
     print("\nMap reminder:\nhttps://youtu.be/lYmgW4UkyZU?si=e8P8j_0xkm0IcT_m")
 
-def getEnemyLaner():
+def getEnemyLaner(role):
+    from lol_api_tester import get_champs_in_teams_in_local_champ_select, estimate_enemy_team_roles
     enemy_champs = get_champs_in_teams_in_local_champ_select()['enemyChamps']
+    enemy_laner = estimate_enemy_team_roles(enemy_champs).get(normalize_role(role))   # keyed by u.gg slug
+    if enemy_laner:
+        print(f"Enemy {role} (estimated from role play rates): {enemy_laner}")
+        return enemy_laner
+
     #     print enemy champs+ assign each a number 1 to 5
     for i, champ in enumerate(enemy_champs, start=1):
         print(f"{i}. {champ}")
@@ -0,0 +1,92 @@
+import re, json, difflib
+from collections import Counter
+
+from utils import profiling
+
+FUZZY_CANDIDATES = 25  # best trigram overlaps that get a full similarity check
+SHORT_INPUT = 3        # inputs this short share too few trigrams to prune by
+
+
+def normalise(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def trigrams(norm: str) -> set[str]:
+    padded = f"^{norm}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AliasIndex:
+    """
+    Normalised alias -> canonical champion name, plus a trigram index so
+    typo matching only scores a handful of candidates instead of every alias.
+
+    aliases[i] is a normalised alias, canonical[i] the champion it resolves to,
+    grams maps a trigram to the alias ids containing it.
+    """
+
+    def __init__(self, aliases: list[str], canonical: list[str],
+                 grams: dict[str, list[int]] | None = None, version: str = ""):
+        self.aliases = aliases
+        self.canonical = canonical
+        self.version = version
+        self.exact = dict(zip(aliases, canonical))
+        if grams is None:
+            grams = {}
+            for i, alias in enumerate(aliases):
+                for g in trigrams(alias):
+                    grams.setdefault(g, []).append(i)
+        self.grams = grams
+
+    @classmethod
+    def from_alias_map(cls, alias_map: dict[str, dict], version: str = "") -> "AliasIndex":
+        exact = {}
+        for canonical, data in alias_map.items():
+            for alias in data["aliases"]:
+                exact.setdefault(normalise(alias), canonical)
+        return cls(list(exact), list(exact.values()), version=version)
+
+    # --- lookups ---------------------------------------------------------
+    def lookup(self, norm: str) -> str | None:
+        return self.exact.get(norm)
+
+    @profiling.profiled("names.fuzzy")
+    def fuzzy(self, norm: str, cutoff: float = 0.5) -> str | None:
+        """ Closest alias by difflib ratio, like difflib.get_close_matches(n=1). """
+        overlap = Counter()
+        if len(norm) > SHORT_INPUT:
+            for g in trigrams(norm):
+                overlap.update(self.grams.get(g, ()))
+
+        # same ordering as get_close_matches: highest ratio, ties -> larger alias
+        best = None
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(norm)
+        for i, _ in overlap.most_common(FUZZY_CANDIDATES):
+            matcher.set_seq1(self.aliases[i])
+            score = matcher.ratio()
+            if score >= cutoff and (best is None or (score, self.aliases[i]) > best):
+                best = (score, self.aliases[i])
+        if best is not None:
+            return self.exact[best[1]]
+
+        # short input or nothing close shares a trigram - score everything
+        guesses = difflib.get_close_matches(norm, self.aliases, n=1, cutoff=cutoff)
+        return self.exact[guesses[0]] if guesses else None
+
+    def resolve(self, name: str, cutoff: float = 0.5) -> str | None:
+        norm = normalise(name)
+        return self.lookup(norm) or self.fuzzy(norm, cutoff)
+
+    # --- persistence -----------------------------------------------------
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "aliases": self.aliases,
+                       "canonical": self.canonical, "grams": self.grams},
+                      f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "AliasIndex":
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(raw["aliases"], raw["canonical"], raw["grams"], raw.get("version", ""))
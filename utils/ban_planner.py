@@ -0,0 +1,142 @@
+"""
+Blind-ban suggestions for a whole champion pool.
+
+    python -m utils.ban_planner                           # champion_pool.txt, every role
+    python -m utils.ban_planner --pool pool.txt --roles top,jungle --count 3
+
+A ban is worth it when the enemy beats one of our picks *and* shows up:
+threat = (their win rate vs our pick - 50) + BAN_PICKRATE_WEIGHT * their
+meta pick rate in that role. The meta pick rates come from the role meta
+table (utils.role_meta) once it's built, else from one reference counter
+page per role; the threats of every (pool champion, role) pair are one
+array operation over the matchup tensor.
+"""
+import argparse, pathlib
+
+import numpy as np
+from tabulate import tabulate
+
+from utils.fetch_ugg import ROLES, role_index
+from utils.matchup_tensor import MatchupTensor, get_tensor, save_tensor, WR, PICKRATE, MATCHES
+from utils.parse_ugg_ssr import DEFAULT_RANK
+from utils.profiling import add_profile_argument, profile_from_args
+from utils.role_meta import get_role_meta
+
+BAN_PICKRATE_WEIGHT = 0.6
+META_REFERENCE = "aatrox"   # counter page whose opponents' pick rates stand in for the role's meta
+MIN_ROLE_MATCHES = 1000     # a pool champion "plays" a role when its counter page has this many games
+
+
+def meta_pickrates(tensor: MatchupTensor, role: str, use_cache: bool = True) -> np.ndarray:
+    """ Pick rate of every champion (registry index) in ``role``, 0 where unknown. """
+    meta = get_role_meta(tensor.rank, build=False)
+    if meta is not None and meta.registry is tensor.registry:
+        return meta.role_pickrates(role).astype(np.float64)
+    ref = tensor.ensure({"name": META_REFERENCE.title(), "slug": META_REFERENCE}, role, use_cache)
+    return np.nan_to_num(tensor.row(ref, role, PICKRATE).astype(np.float64))
+
+
+class BanPlan:
+    """
+    Threats of every enemy to every (pool champion, role) pair:
+    ``threat[k, e]`` for ``pairs[k] = (pick index, role)``, NaN where the
+    enemy does not beat the pick or never shows up.
+    """
+
+    def __init__(self, tensor: MatchupTensor, pairs: list[tuple[int, str]], threat: np.ndarray,
+                 wr: np.ndarray, pickrate: np.ndarray, matches: np.ndarray):
+        self.tensor = tensor
+        self.pairs = pairs
+        self.threat = threat
+        self.wr = wr
+        self.pickrate = pickrate
+        self.matches = matches
+
+    def _rows(self, k: int, enemies: np.ndarray) -> list[tuple[str, float, float, float, int]]:
+        names = self.tensor.registry.names
+        return [(names[e], float(self.threat[k, e]), float(self.wr[k, e]), float(self.pickrate[k, e]),
+                 int(self.matches[k, e])) for e in enemies]
+
+    def for_pick(self, pick: int, role: str, count: int = 5) -> list[tuple[str, float, float, float, int]]:
+        """ [(enemy, threat, their wr, pick rate, matches), ...] worst first """
+        try:
+            k = self.pairs.index((pick, role))
+        except ValueError:
+            name = self.tensor.registry.names[pick] if 0 <= pick < len(self.tensor.registry) else f"#{pick}"
+            raise KeyError(f"no ban plan for {name} in {role}") from None
+        threat = self.threat[k]
+        enemies = np.flatnonzero(~np.isnan(threat))
+        return self._rows(k, enemies[np.argsort(-threat[enemies], kind="stable")][:count])
+
+    def per_pick(self, count: int = 5) -> dict[tuple[str, str], list]:
+        """ {(pool champion, role): for_pick(...)} for every pair """
+        names = self.tensor.registry.names
+        return {(names[pick], role): self.for_pick(pick, role, count) for pick, role in self.pairs}
+
+    def combined(self, count: int = 5) -> list[tuple[str, float, int]]:
+        """
+        Bans for the whole pool when we don't know what we'll play yet:
+        [(enemy, mean threat over all pairs, pairs it threatens), ...]. An
+        enemy that doesn't threaten a pair counts as 0 there.
+        """
+        mean = np.nan_to_num(self.threat).mean(axis=0)
+        hits = (~np.isnan(self.threat)).sum(axis=0)
+        enemies = np.flatnonzero(hits)
+        order = enemies[np.argsort(-mean[enemies], kind="stable")][:count]
+        names = self.tensor.registry.names
+        return [(names[e], float(mean[e]), int(hits[e])) for e in order]
+
+
+def plays_role(tensor: MatchupTensor, pick: int, role: str, min_matches: int = MIN_ROLE_MATCHES) -> bool:
+    return np.nansum(tensor.row(pick, role, MATCHES)) >= min_matches
+
+
+def plan_bans(tensor: MatchupTensor, pool: list[str], roles=ROLES, use_cache: bool = True,
+              min_matches: int = MIN_ROLE_MATCHES) -> BanPlan:
+    """ Load what's missing, then score every (pool champion, role) pair in one pass. """
+    reg = tensor.registry
+    picks = tensor.indices(pool)
+    pairs = []
+    for role in roles:
+        for pick in picks:
+            tensor.ensure({"name": reg.names[pick], "slug": reg.slugs[pick]}, role, use_cache)
+            if plays_role(tensor, pick, role, min_matches):
+                pairs.append((int(pick), role))
+
+    meta = {role: meta_pickrates(tensor, role, use_cache) for role in {r for _, r in pairs}}
+    r_idx = np.array([role_index(role) for _, role in pairs], dtype=np.intp)
+    p_idx = np.array([pick for pick, _ in pairs], dtype=np.intp)
+    wr = tensor.stats[WR, r_idx, p_idx, :].astype(np.float64)          # (pairs, enemies): their wr vs pick
+    matches = np.nan_to_num(tensor.stats[MATCHES, r_idx, p_idx, :])
+    pickrate = np.stack([meta[role] for _, role in pairs]) if pairs else np.zeros((0, len(reg)))
+    with np.errstate(invalid="ignore"):
+        threat = np.where((wr > 50) & (pickrate > 0), (wr - 50) + BAN_PICKRATE_WEIGHT * pickrate, np.nan)
+    return BanPlan(tensor, pairs, threat, wr, pickrate, matches)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Blind-ban suggestions for every champion in your pool")
+    ap.add_argument("--pool", default="champion_pool.txt", help="Path to your champion pool file")
+    ap.add_argument("--roles", default=",".join(ROLES), help="Comma separated roles to consider")
+    ap.add_argument("--rank", default=DEFAULT_RANK, help="u.gg rank filter")
+    ap.add_argument("--count", type=int, default=5, help="Bans to list per champion")
+    add_profile_argument(ap)
+    args = ap.parse_args()
+    profile_from_args(args)
+
+    pool = [c.strip() for c in pathlib.Path(args.pool).read_text().splitlines() if c.strip()]
+    tensor = get_tensor(args.rank)
+    plan = plan_bans(tensor, pool, tuple(r.strip() for r in args.roles.split(",") if r.strip()))
+    save_tensor(tensor)
+
+    for (champ, role), bans in plan.per_pick(args.count).items():
+        print(f"\n{champ} ({role})")
+        print(tabulate([b[:4] for b in bans], headers=["Ban", "Threat", "Their WR %", "Pick rate %"],
+                       floatfmt=".2f"))
+    print("\nBest bans for the whole pool\n")
+    print(tabulate(plan.combined(args.count), headers=["Ban", "Mean threat", "Pool picks threatened"],
+                   floatfmt=".2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Answer many counterpick questions in one process.
+
+    python refactor_known_champ_pool_helper.py --batch queries.jsonl
+    cat queries.jsonl | python refactor_known_champ_pool_helper.py --batch - --format csv > sheet.csv
+
+One JSON object per line:
+
+    {"enemy": "darius", "role": "top", "pool": "pools/alice.txt", "rank": "emerald_plus"}
+    {"enemy": "ahri", "role": "mid", "enemies": ["ahri", "lee sin", "jinx", "nautilus", "ksante"]}
+
+Everything but ``enemy`` is optional (defaults come from the command line);
+with ``enemies`` the query is scored against the whole team, ``enemy`` being
+the lane opponent, and the answer lists the ``scored_enemies`` that had
+matchup data in that role. The alias map, pool files and tensors are
+loaded once and every counter page the batch needs is fetched up front,
+concurrently.
+"""
+import csv, json, math, pathlib, sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterable, Iterator
+
+from utils.champion_names import get_champ_name_variations
+from utils.http_client import HTTPError
+from utils.matchup_tensor import MatchupTensor, get_tensor, save_tensor
+from utils.parse_ugg_ssr import DEFAULT_RANK
+from utils.team_scoring import score_pool_vs_team, scored_enemies, LANE_WEIGHT, TEAM_WEIGHT
+
+BATCH_WORKERS = 8   # concurrent counter page loads while warming
+BATCH_CHUNK = 64    # queries read, warmed and answered at a time
+CSV_FIELDS = ["query", "enemy", "role", "rank", "pool", "champion", "score", "wr", "gd15",
+              "lane_wr", "team_wr", "matches", "error"]
+
+
+def json_number(x: float) -> float | None:
+    return None if math.isnan(x) else round(x, 4)   # NaN is not JSON
+
+
+def read_queries(source: IO[str]) -> Iterator[dict]:
+    """ Queries one line at a time; a malformed line comes out as ``{"error": ...}``
+    (BatchRunner.run answers it with an error row and carries on). """
+    for n, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            query = json.loads(line)
+        except ValueError as e:
+            yield {"error": f"line {n}: {e}"}
+            continue
+        if not isinstance(query, dict) or not query.get("enemy"):
+            yield {"error": f"line {n}: expected an object with an 'enemy'"}
+            continue
+        yield query
+
+
+class BatchRunner:
+    """ Shared state for a batch: alias map, pool files and one tensor per rank. """
+
+    def __init__(self, champ_name_map: dict[str, dict], role: str = "top",
+                 pool: str = "champion_pool.txt", rank: str = DEFAULT_RANK,
+                 lane_weight: float = LANE_WEIGHT, team_weight: float = TEAM_WEIGHT,
+                 use_cache: bool = True):
+        self.champ_name_map = champ_name_map
+        self.defaults = {"role": role, "pool": pool, "rank": rank}
+        self.lane_weight = lane_weight
+        self.team_weight = team_weight
+        self.use_cache = use_cache
+        self._pools: dict[str, set[str]] = {}
+
+    def normalise(self, query: dict) -> dict:
+        """ Defaults filled in, champion names resolved to alias map entries. """
+        q = {**self.defaults, **query}
+        q["enemy"] = get_champ_name_variations(q["enemy"], self.champ_name_map)
+        if q.get("enemies"):
+            names = q["enemies"].split(",") if isinstance(q["enemies"], str) else q["enemies"]
+            enemies = [get_champ_name_variations(n.strip(), self.champ_name_map) for n in names if n.strip()]
+            if q["enemy"] not in enemies:
+                enemies.append(q["enemy"])
+            q["enemies"] = enemies
+        return q
+
+    def pool(self, path: str) -> set[str]:
+        if path not in self._pools:
+            self._pools[path] = {c.strip().lower() for c in pathlib.Path(path).read_text().splitlines()
+                                 if c.strip()}
+        return self._pools[path]
+
+    def warm(self, queries: list[dict]):
+        """ Load every (rank, role, enemy) counter page the batch needs, concurrently. """
+        needed = {}
+        for q in queries:
+            for enemy in q.get("enemies") or [q["enemy"]]:
+                needed[(q["rank"], q["role"], enemy["slug"])] = (get_tensor(q["rank"]), enemy, q["role"])
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+            futures = [pool.submit(tensor.ensure, enemy, role, self.use_cache)
+                       for tensor, enemy, role in needed.values()]
+        for f in futures:
+            if f.exception() is not None:
+                print(f"warning: {f.exception()}", file=sys.stderr)   # answered as an error later
+
+    def answer(self, q: dict) -> list[dict]:
+        tensor: MatchupTensor = get_tensor(q["rank"])
+        pool = tensor.indices(self.pool(q["pool"]))
+        lane = tensor.ensure(q["enemy"], q["role"], self.use_cache)
+        if not q.get("enemies"):
+            return [{"champion": name, "wr": json_number(wr), "gd15": json_number(gd15), "matches": matches}
+                    for name, wr, gd15, matches in tensor.best_vs(lane, q["role"], pool)]
+        enemies = [tensor.ensure(e, q["role"], self.use_cache) for e in q["enemies"]]
+        ranked = score_pool_vs_team(tensor, pool, enemies, q["role"], lane,
+                                    self.lane_weight, self.team_weight)
+        return [{"champion": name, "score": json_number(score), "lane_wr": json_number(lane_wr), "team_wr": json_number(team_wr),
+                 "matches": matches}
+                for name, score, lane_wr, team_wr, matches in ranked]
+
+    def scored_enemies(self, q: dict) -> list[str]:
+        """ Names of the non-lane enemies a team query's score actually drew on. """
+        tensor = get_tensor(q["rank"])
+        enemies = [tensor.registry.index_for_slug(e["slug"]) for e in q["enemies"]]
+        lane = tensor.registry.index_for_slug(q["enemy"]["slug"])
+        picked = scored_enemies(tensor, tensor.indices(self.pool(q["pool"])), enemies, q["role"], lane)
+        return [tensor.registry.names[e] for e in picked]
+
+    def run(self, queries: Iterable[dict], chunk: int = BATCH_CHUNK) -> Iterator[dict]:
+        """ Yields one result per query, in order; failures carry an ``error``.
+        Queries are taken ``chunk`` at a time, so input is streamed. """
+        ranks, batch = set(), []
+        for n, query in enumerate(queries, start=1):
+            batch.append((n, query))
+            if len(batch) >= chunk:
+                yield from self._run_chunk(batch, ranks)
+                batch = []
+        yield from self._run_chunk(batch, ranks)
+
+        for tensor_rank in ranks:
+            save_tensor(get_tensor(tensor_rank))
+
+    def _run_chunk(self, batch: list[tuple[int, dict]], ranks: set[str]) -> Iterator[dict]:
+        prepared = []
+        for n, query in batch:
+            try:
+                if "error" in query:
+                    raise ValueError(query["error"])
+                prepared.append((n, query, self.normalise(query), None))
+            except (ValueError, OSError) as e:
+                prepared.append((n, query, None, str(e)))
+        self.warm([q for _, _, q, _ in prepared if q is not None])
+
+        for n, query, q, error in prepared:
+            result = {"query": n, "enemy": query.get("enemy"),
+                      **{k: query.get(k, v) for k, v in self.defaults.items()}}
+            if q is not None:
+                ranks.add(q["rank"])
+                result["enemy"] = q["enemy"]["name"]
+                if q.get("enemies"):
+                    result["enemies"] = [e["name"] for e in q["enemies"]]
+                try:
+                    result["results"] = self.answer(q)
+                    if q.get("enemies"):
+                        result["scored_enemies"] = self.scored_enemies(q)
+                except (KeyError, ValueError, OSError, RuntimeError, HTTPError) as e:
+                    error = str(e)
+            if error is not None:
+                result["error"] = error
+            yield result
+
+
+def write_results(results: Iterable[dict], out: IO[str], fmt: str = "jsonl"):
+    """ Stream results as JSON lines (one per query) or CSV (one row per champion). """
+    if fmt == "jsonl":
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        return
+
+    writer = csv.DictWriter(out, CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for result in results:
+        head = {k: result.get(k) for k in ("query", "enemy", "role", "rank", "pool")}
+        if "error" in result:
+            writer.writerow({**head, "error": result["error"]})
+        for row in result.get("results", []):
+            writer.writerow({**head, **row})
+        out.flush()
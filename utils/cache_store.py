@@ -0,0 +1,360 @@
+import os, re, sys, json, gzip, time, atexit, queue, weakref, tempfile, threading, contextlib
+from typing import Callable
+
+from utils import profiling
+
+INDEX_NAME = "index.json"
+LOCK_NAME = "index.lock"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB of compressed entries
+FLUSH_EVERY = 32          # puts between index writes (the rest is written at exit) ...
+FLUSH_INTERVAL = 30.0     # ... or seconds, for long running processes
+LOCK_TIMEOUT = 10.0       # seconds before a leftover index.lock is treated as abandoned
+REFRESH_WORKERS = 1       # in order: a job queued after its page's refresh finds the page fresh
+REFRESH_EXIT_WAIT = 5.0   # seconds a finishing process gives queued refreshes
+
+
+def _atomic_write(path: str, data: bytes):
+    """ Write to a temp file in the same dir and rename over the target,
+    so readers see either the old file or the new one, never half of it. """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+_stores: "weakref.WeakSet[CacheStore]" = weakref.WeakSet()
+
+
+def _flush_all():
+    for store in list(_stores):
+        store.flush()
+
+
+# registered before any Revalidator, so it runs after their drain at exit
+atexit.register(_flush_all)
+
+
+def _remove_abandoned_lock(path: str):
+    """ Delete ``path`` if it is older than LOCK_TIMEOUT. It is renamed away first,
+    so of several waiters only one gets it; a lock that turns out to be live
+    (re-created since we looked) is put back unless a new one exists. """
+    try:
+        if time.time() - os.path.getmtime(path) < LOCK_TIMEOUT:
+            return
+        grabbed = f"{path}.{os.getpid()}.{threading.get_ident()}.stale"
+        os.rename(path, grabbed)
+    except OSError:
+        return   # released, or another waiter got there first
+    try:
+        if time.time() - os.path.getmtime(grabbed) < LOCK_TIMEOUT:
+            os.link(grabbed, path)   # fails if a new lock exists already
+    except OSError:
+        pass
+    finally:
+        try:
+            os.remove(grabbed)
+        except OSError:
+            pass
+
+
+class CacheStore:
+    """
+    Directory of gzip-compressed entries plus a json index.
+
+    index.json:
+    {
+        "15_9_aatrox_top": {
+            "file": "15_9_aatrox_top.gz",
+            "patch": "15_9",
+            "size": 81234,          # compressed bytes on disk
+            "stored_at": 1747296398.6,
+            "last_access": 1747296410.2
+        }
+    }
+
+    Total compressed size is kept under ``max_bytes`` by evicting the least
+    recently used entries. Entries and the index are written atomically;
+    the index is written every FLUSH_EVERY puts (or FLUSH_INTERVAL seconds)
+    and at exit. When several
+    processes share a directory the index is merged with what is on disk
+    before it is written back, under an index.lock file.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES, suffix: str = ".gz"):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.name = os.path.basename(os.path.normpath(root))   # for profiling counters
+        self._lock = threading.RLock()
+        self._index: dict[str, dict] | None = None
+        self._removed: set[str] = set()   # deleted since the last flush
+        self._dirty = False
+        self._unflushed_puts = 0
+        self._last_flush = time.monotonic()
+        _stores.add(self)                 # flushed at exit, also persists access times from get()
+
+    # --- index -----------------------------------------------------------
+    def _index_path(self) -> str:
+        return os.path.join(self.root, INDEX_NAME)
+
+    def _read_index_file(self) -> dict[str, dict]:
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _entries(self) -> dict[str, dict]:
+        if self._index is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._index = self._read_index_file()
+        return self._index
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        """ Cross-process lock around read-merge-write of the index. """
+        path = os.path.join(self.root, LOCK_NAME)
+        token = f"{os.getpid()}.{threading.get_ident()}".encode()
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                _remove_abandoned_lock(path)
+                time.sleep(0.01)
+                continue
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            break
+        try:
+            yield
+        finally:
+            # only our own lock: after LOCK_TIMEOUT someone may have taken it over
+            try:
+                with open(path, "rb") as f:
+                    if f.read() == token:
+                        os.remove(path)
+            except OSError:
+                pass
+
+    def flush(self):
+        """ Merge our view of the index with the on-disk one and write it. """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = self._entries()
+            with self._index_lock():
+                on_disk = self._read_index_file()
+                for key, meta in on_disk.items():
+                    mine = entries.get(key)
+                    if mine is None:
+                        if key not in self._removed:
+                            entries[key] = meta
+                    elif meta.get("stored_at", 0) > mine.get("stored_at", 0):
+                        entries[key] = {**meta, "last_access": max(meta.get("last_access", 0),
+                                                                   mine.get("last_access", 0))}
+                    else:
+                        mine["last_access"] = max(meta.get("last_access", 0), mine.get("last_access", 0))
+                # drop entries whose file another process already removed
+                for key in [k for k, m in entries.items()
+                            if not os.path.exists(os.path.join(self.root, m["file"]))]:
+                    del entries[key]
+
+                _atomic_write(self._index_path(), json.dumps(entries).encode())
+            self._removed.clear()
+            self._dirty = False
+            self._unflushed_puts = 0
+            self._last_flush = time.monotonic()
+
+    # --- entries ---------------------------------------------------------
+    def _file_for(self, key: str) -> str:
+        return re.sub(r"[^\w.-]", "_", key) + self.suffix
+
+    def get(self, key: str, max_age: float | None = None) -> bytes | None:
+        """ Decompressed entry, or None when missing or older than max_age seconds. """
+        return self._get(key, max_age)[0]
+
+    def get_with_age(self, key: str) -> tuple[bytes | None, float]:
+        """ (decompressed entry however old, seconds since it was stored) - (None, inf) when missing. """
+        return self._get(key, None)
+
+    def _get(self, key: str, max_age: float | None) -> tuple[bytes | None, float]:
+        with profiling.span("cache.get", store=self.name):
+            data, age = self._read(key, max_age)
+        profiling.count(f"cache.{self.name}.{'miss' if data is None else 'hit'}")
+        if data is not None:
+            profiling.count(f"cache.{self.name}.bytes_read", len(data))
+        return data, age
+
+    def _read(self, key: str, max_age: float | None) -> tuple[bytes | None, float]:
+        with self._lock:
+            meta = self._entries().get(key)
+            if meta is None:
+                return None, float("inf")
+            age = time.time() - meta.get("stored_at", 0)
+            if max_age is not None and age >= max_age:
+                return None, age
+            path = os.path.join(self.root, meta["file"])
+        try:
+            with open(path, "rb") as f:
+                data = gzip.decompress(f.read())
+        except (OSError, EOFError):
+            # evicted by someone else or unreadable - treat as a miss
+            self.delete(key)
+            return None, float("inf")
+        with self._lock:
+            meta["last_access"] = time.time()
+            self._dirty = True
+        return data, age
+
+    def age(self, key: str) -> float | None:
+        """ Seconds since the entry was stored, None when missing. """
+        with self._lock:
+            meta = self._entries().get(key)
+            return None if meta is None else time.time() - meta.get("stored_at", 0)
+
+    @profiling.profiled("cache.put")
+    def put(self, key: str, data: bytes, patch: str | None = None, stored_at: float | None = None):
+        """ ``stored_at`` backdates data derived from an older entry (default: now). """
+        profiling.count(f"cache.{self.name}.bytes_written", len(data))
+        blob = gzip.compress(data, compresslevel=6, mtime=0)
+        with self._lock:
+            entries = self._entries()
+            file_name = self._file_for(key)
+            _atomic_write(os.path.join(self.root, file_name), blob)
+            now = time.time()
+            entries[key] = {
+                "file": file_name,
+                "patch": patch,
+                "size": len(blob),
+                "stored_at": now if stored_at is None else stored_at,
+                "last_access": now,
+            }
+            self._removed.discard(key)
+            self._dirty = True
+            self._evict()
+            self._unflushed_puts += 1
+            if self._unflushed_puts >= FLUSH_EVERY or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self.flush()
+
+    def delete(self, key: str):
+        with self._lock:
+            meta = self._entries().pop(key, None)
+            if meta is None:
+                return
+            try:
+                os.remove(os.path.join(self.root, meta["file"]))
+            except OSError:
+                pass
+            self._removed.add(key)
+            self._dirty = True
+
+    def _age_entries_for_bench(self, seconds: float, keys: list[str] | None = None) -> int:
+        """ Benchmarks only: move the stored_at of every entry (or just ``keys``)
+        ``seconds`` into the past to exercise expiry. Written to the index
+        right away, since a merge keeps the newer stored_at. Returns how many were aged. """
+        with self._lock:
+            self._entries()
+            self.flush()
+            with self._index_lock():
+                self._index = entries = self._read_index_file()
+                aged = [k for k in (entries if keys is None else keys) if k in entries]
+                for key in aged:
+                    entries[key]["stored_at"] = entries[key].get("stored_at", 0) - seconds
+                _atomic_write(self._index_path(), json.dumps(entries).encode())
+            return len(aged)
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return list(self._entries())
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(m.get("size", 0) for m in self._entries().values())
+
+    # --- housekeeping ----------------------------------------------------
+    def _evict(self):
+        entries = self._entries()
+        total = sum(m.get("size", 0) for m in entries.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(entries, key=lambda k: entries[k].get("last_access", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key].get("size", 0)
+            self.delete(key)
+
+    def purge_patches(self, keep: set[str]) -> int:
+        """ Drop every entry tagged with a patch not in ``keep``
+        (untagged entries stay). Returns how many were removed. """
+        with self._lock:
+            stale = [k for k, m in self._entries().items()
+                     if m.get("patch") is not None and m["patch"] not in keep]
+            for key in stale:
+                self.delete(key)
+            self.flush()
+            return len(stale)
+
+
+class Revalidator:
+    """
+    Background refreshes for stale-while-revalidate: callers hand over a
+    job per cache key and return their stale copy right away. A key that is
+    already queued or running is not queued again. Jobs swap the new data
+    in with CacheStore.put, so readers see the old entry or the new one.
+    With one worker jobs run in submission order.
+    """
+
+    def __init__(self, workers: int = REFRESH_WORKERS, exit_wait: float = REFRESH_EXIT_WAIT):
+        self.workers = workers
+        self._queue: queue.Queue[tuple[str, Callable[[], object]]] = queue.Queue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        atexit.register(self.drain, exit_wait)
+
+    def submit(self, key: str, job: Callable[[], object]) -> bool:
+        """ Queue ``job`` unless ``key`` is already being refreshed; True when queued. """
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name="cache-refresh", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        profiling.count("swr.queued")
+        self._queue.put((key, job))
+        return True
+
+    def _work(self):
+        while True:
+            key, job = self._queue.get()
+            try:
+                with profiling.span("swr.refresh", key=key):
+                    job()
+            except Exception as e:   # network or parse trouble - the stale copy stays
+                profiling.count("swr.failed")
+                print(f"background refresh of {key} failed: {e}", file=sys.stderr)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """ Wait until nothing is queued or running; False on timeout. """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+        return True
@@ -1,17 +1,50 @@
-import re, json
-import requests
+import json
 from .fetch_ugg import fetch_champ_counter_ugg
-from .parse_ugg_ssr import extract_json_from_html, get_ssr_subdata
-import difflib
-from utils.patch import get_current_patch
+from .parse_ugg_ssr import get_ssr_subdata, get_page_registry
+from .ssr_document import SSRDocument, SSR_KEY
+from .alias_index import AliasIndex, normalise
+from utils import profiling
+from utils.patch import PATCH_META_URL, get_current_patch
 
 
-PATCH_META_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+ALIAS_INDEX_PATH = "./cache/champ_alias_index.json"
 
-def normalise(name: str) -> str:
-    return re.sub(r"[^a-z0-9]", "", name.lower())
+# (alias_map, index) of the last map we resolved against
+_alias_index: tuple[dict, AliasIndex] | None = None
+_pinned_alias_map: dict[str, dict] | None = None
 
+
+def pin_alias_map(alias_map: dict[str, dict], index: AliasIndex | None = None):
+    """ Serve ``alias_map`` (and its index) from load_champ_name_map, e.g. from a snapshot bundle. """
+    global _alias_index, _pinned_alias_map
+    _pinned_alias_map = alias_map
+    _alias_index = (alias_map, index) if index is not None else None
+
+
+def get_alias_index(alias_map: dict[str, dict]) -> AliasIndex:
+    """ Index for ``alias_map``: memoised, else the persisted one, else built. """
+    global _alias_index
+    if _alias_index is not None and _alias_index[0] is alias_map:
+        return _alias_index[1]
+
+    index = None
+    try:
+        index = AliasIndex.load(ALIAS_INDEX_PATH)
+        if index.version != get_current_patch() or set(index.canonical) != alias_map.keys():
+            index = None
+    except (OSError, ValueError, KeyError):
+        pass
+    if index is None:
+        index = AliasIndex.from_alias_map(alias_map, get_current_patch())
+
+    _alias_index = (alias_map, index)
+    return index
+
+
+@profiling.profiled("names.load_map")
 def load_champ_name_map() -> dict[str, dict]:
+    if _pinned_alias_map is not None:
+        return _pinned_alias_map
     current_version = get_current_patch()
     cache_path = "./cache/champ_alias_map.json"
     version_path = "./cache/champ_alias_map.version"
@@ -25,24 +58,22 @@ def load_champ_name_map() -> dict[str, dict]:
 
     # champion irrelevant to get this data
     html = fetch_champ_counter_ugg("aatrox", "top")
-    ssr = extract_json_from_html(html, "window.__SSR_DATA__")
+    ssr = SSRDocument.from_html(html, SSR_KEY)
 
     # Official Riot champion data
-    champ_data = get_ssr_subdata(ssr, "en_US/champion.json")
+    registry = get_page_registry(ssr)
     # SEO aliases (nicknames etc)
     seo_block = get_ssr_subdata(ssr, "seo-champion-names.json")
 
     alias_map = {}
 
-    for champ_info in champ_data.values():
-        canonical = champ_info.get("name")
-        slug = champ_info.get("id").lower()
+    for champ_id, canonical, slug in zip(registry.ids, registry.names, registry.slugs):
         if not canonical:
             continue
 
         aliases = {canonical}
 
-        seo_info = seo_block.get(champ_info["key"])
+        seo_info = seo_block.get(str(champ_id))
         if seo_info:
             for k in ("name", "altName", "altName2"):
                 alt = seo_info.get(k)
@@ -59,33 +90,18 @@ def load_champ_name_map() -> dict[str, dict]:
         json.dump(alias_map, f, ensure_ascii=False, indent=2)
     with open(version_path, "w") as f:
         f.write(current_version)
+    AliasIndex.from_alias_map(alias_map, current_version).save(ALIAS_INDEX_PATH)
 
     return alias_map
 
+@profiling.profiled("names.resolve")
 def get_champ_name_variations(user_input: str, alias_map: dict[str, dict]) -> dict:
     """
     Resolves user input to canonical champion data (slug + aliases).
     Returns the full alias_map entry.
     """
-    norm_input = normalise(user_input)
-
-    # Exact match through aliases
-    for canonical, data in alias_map.items():
-        for alias in data["aliases"]:
-            if normalise(alias) == norm_input:
-                return data  # contains slug & aliases
-
-    # Fuzzy match against aliases
-    all_aliases = {
-        normalise(alias): canonical
-        for canonical, data in alias_map.items()
-        for alias in data["aliases"]
-    }
-
-    guesses = difflib.get_close_matches(norm_input, all_aliases.keys(), n=1, cutoff=0.5)
-    if guesses:
-        canonical = all_aliases[guesses[0]]
+    canonical = get_alias_index(alias_map).resolve(user_input)
+    if canonical:
         return alias_map[canonical]
 
     raise ValueError(f"Champion '{user_input}' not recognized")
-
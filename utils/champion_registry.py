@@ -0,0 +1,133 @@
+import os, json, threading
+from array import array
+from typing import Callable
+
+from utils import http_client, profiling
+from utils.patch import DDRAGON_BASE_URL, get_current_patch, HEADERS
+
+REGISTRY_DIR = "./cache"
+DDRAGON_CHAMPIONS_URL = DDRAGON_BASE_URL + "/cdn/{patch}/data/en_US/champion.json"
+
+
+class ChampionRegistry:
+    """
+    Static champion data of one patch, indexed every way we look it up.
+
+    Champions are stored densely in id order: ``ids[i]``, ``names[i]`` and
+    ``slugs[i]`` describe champion index ``i`` and ``index_of_id[cid]`` maps a
+    Riot champion id back to it (-1 for unused ids). Slugs are u.gg's,
+    i.e. the lower-cased Data Dragon id ('monkeyking' for Wukong).
+    """
+
+    def __init__(self, patch: str, champions: list[tuple[int, str, str]]):
+        champions = sorted(champions)
+        self.patch = patch
+        self.ids = array("H", (cid for cid, _, _ in champions))
+        self.names = [name for _, name, _ in champions]
+        self.slugs = [slug for _, _, slug in champions]
+
+        self.index_of_id = array("h", [-1]) * (max(self.ids, default=0) + 1)
+        for i, cid in enumerate(self.ids):
+            self.index_of_id[cid] = i
+        self._by_name = {name.lower(): i for i, name in enumerate(self.names)}
+        self._by_slug = {slug: i for i, slug in enumerate(self.slugs)}
+
+    @classmethod
+    def from_champion_json(cls, patch: str, data: dict) -> "ChampionRegistry":
+        """ ``data`` is the "data" dict of Riot's champion.json """
+        return cls(patch, [(int(info["key"]), info["name"], info["id"].lower())
+                           for info in data.values()])
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- lookups ---------------------------------------------------------
+    def index(self, champ_id: int) -> int:
+        return self.index_of_id[champ_id] if 0 <= champ_id < len(self.index_of_id) else -1
+
+    def name(self, champ_id: int, default: str | None = None) -> str | None:
+        i = self.index(champ_id)
+        return self.names[i] if i >= 0 else default
+
+    def slug(self, champ_id: int, default: str | None = None) -> str | None:
+        i = self.index(champ_id)
+        return self.slugs[i] if i >= 0 else default
+
+    def index_for_name(self, name: str) -> int:
+        return self._by_name.get(name.lower(), -1)
+
+    def index_for_slug(self, slug: str) -> int:
+        return self._by_slug.get(slug.lower(), -1)
+
+    def id_for_name(self, name: str) -> int | None:
+        i = self.index_for_name(name)
+        return self.ids[i] if i >= 0 else None
+
+    def id_to_name(self) -> dict[int, str]:
+        return dict(zip(self.ids, self.names))
+
+    # --- persistence -----------------------------------------------------
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"patch": self.patch,
+                       "champions": list(zip(self.ids, self.names, self.slugs))},
+                      f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "ChampionRegistry":
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(raw["patch"], [tuple(c) for c in raw["champions"]])
+
+
+# --- process wide registries, one per patch -------------------------------
+_registries: dict[str, ChampionRegistry] = {}
+_lock = threading.Lock()
+
+
+def registry_path(patch: str) -> str:
+    return os.path.join(REGISTRY_DIR, f"champions_{patch}.json")
+
+
+def add_registry(registry: ChampionRegistry):
+    """ Make ``registry`` the one get_registry() returns for its patch. """
+    with _lock:
+        _registries[registry.patch] = registry
+
+
+def get_registry(patch: str | None = None,
+                 champion_json: Callable[[], dict] | None = None) -> ChampionRegistry:
+    """
+    Registry for ``patch`` (default: current Data Dragon patch), loaded at most
+    once per process: memory, then ./cache/champions_{patch}.json, then
+    ``champion_json()`` if given (e.g. the champion.json block of a page we
+    already have), then Data Dragon.
+    """
+    patch = patch or get_current_patch()
+    registry = _registries.get(patch)
+    if registry is not None:
+        return registry
+
+    with _lock:
+        registry = _registries.get(patch)
+        if registry is not None:
+            return registry
+
+        path = registry_path(patch)
+        try:
+            with profiling.span("registry.load", patch=patch):
+                registry = ChampionRegistry.load(path)
+        except (OSError, ValueError, KeyError):
+            with profiling.span("registry.build", patch=patch):
+                if champion_json is not None:
+                    data = champion_json()
+                else:
+                    r = http_client.get(DDRAGON_CHAMPIONS_URL.format(patch=patch), headers=HEADERS)
+                    r.raise_for_status()
+                    data = r.json()["data"]
+                registry = ChampionRegistry.from_champion_json(patch, data)
+            os.makedirs(REGISTRY_DIR, exist_ok=True)
+            registry.save(path)
+
+        _registries[patch] = registry
+        return registry
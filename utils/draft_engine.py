@@ -0,0 +1,226 @@
+"""
+Stateful pick recommendations that follow a live draft.
+
+    python -m utils.draft_engine --pool champion_pool.txt            # real client
+    python -m utils.draft_engine --pool champion_pool.txt --lockfile ./lockfile
+
+DraftEngine keeps per-enemy win-rate rows (over the pool) and running
+per-pool-champion sums, so a pick, ban or swap only touches the rows it
+affects instead of re-scoring the draft from scratch. With a role meta
+table the lane opponent is re-estimated from the enemy picks on every
+update.
+"""
+import argparse, asyncio, pathlib
+
+import numpy as np
+from tabulate import tabulate
+
+from utils.fetch_ugg import ROLES
+from utils.http_client import HTTPError
+from utils.lcu import read_lockfile, LOCKFILE_PATH, LCU_POSITION_TO_ROLE
+from utils.lcu_watcher import ChampSelectDelta, ChampSelectWatcher
+from utils.matchup_tensor import MatchupTensor, get_tensor, save_tensor, WR
+from utils.profiling import add_profile_argument, profile_from_args
+from utils.role_meta import RoleMeta, assign_roles, get_role_meta
+from utils.team_scoring import combine_scores, LANE_WEIGHT, TEAM_WEIGHT
+
+# what loading one enemy's counter page can raise (u.gg down, page without the lane block, ...)
+ROW_ERRORS = (RuntimeError, KeyError, ValueError, OSError, HTTPError)
+
+class DraftEngine:
+    def __init__(self, pool: list[str], role: str = "top", tensor: MatchupTensor | None = None,
+                 lane_weight: float = LANE_WEIGHT, team_weight: float = TEAM_WEIGHT,
+                 use_cache: bool = True, role_meta: RoleMeta | None = None):
+        self.tensor = tensor or get_tensor()
+        self.role_meta = role_meta     # set -> lane opponent follows the enemy picks
+        self.pool = self.tensor.indices(pool)
+        self.role = role
+        self.lane_weight = lane_weight
+        self.team_weight = team_weight
+        self.use_cache = use_cache
+
+        self.ally_picks: dict[int, int] = {}    # cellId -> champion index
+        self.enemy_picks: dict[int, int] = {}   # cellId -> champion index
+        self.bans: set[int] = set()             # champion indices
+        self.lane_enemy: int | None = None      # champion index
+
+        # partial scores: per-enemy rows and running sums over non-lane enemies
+        self._rows: dict[int, np.ndarray] = {}
+        self._team_sum = np.zeros(len(self.pool))
+        self._team_cnt = np.zeros(len(self.pool), dtype=np.intp)
+        self._ranked: list | None = None
+
+    # --- partial scores --------------------------------------------------
+    def _row(self, enemy: int) -> np.ndarray:
+        """ Our pool's win rates vs ``enemy`` (NaN = no data), loaded once per role. """
+        row = self._rows.get(enemy)
+        if row is None:
+            reg = self.tensor.registry
+            self.tensor.ensure({"name": reg.names[enemy], "slug": reg.slugs[enemy]},
+                               self.role, self.use_cache)
+            row = self.tensor.row(enemy, self.role, WR)[self.pool].astype(np.float64)
+            self._rows[enemy] = row
+        return row
+
+    def _add_team(self, enemy: int, sign: int):
+        row = self._row(enemy)
+        have = ~np.isnan(row)
+        self._team_sum += sign * np.where(have, row, 0.0)
+        self._team_cnt += sign * have
+
+    def _team_enemies(self) -> list[int]:
+        return [e for e in self.enemy_picks.values() if e != self.lane_enemy]
+
+    def _rebuild(self):
+        self._team_sum[:] = 0
+        self._team_cnt[:] = 0
+        for enemy in self._team_enemies():
+            self._add_team(enemy, +1)
+        self._ranked = None
+
+    # --- draft changes ---------------------------------------------------
+    def set_enemy_pick(self, cell: int, champ: int):
+        """ ``champ`` is a champion index, -1 clears the cell. The row is loaded
+        first: when that raises, the draft is left as it was. """
+        if champ >= 0:
+            self._row(champ)
+        old = self.enemy_picks.pop(cell, None)
+        if old is not None and old != self.lane_enemy:
+            self._add_team(old, -1)
+        if champ >= 0:
+            self.enemy_picks[cell] = champ
+            if champ != self.lane_enemy:
+                self._add_team(champ, +1)
+        self._ranked = None
+
+    def set_ally_pick(self, cell: int, champ: int):
+        if champ >= 0:
+            self.ally_picks[cell] = champ
+        else:
+            self.ally_picks.pop(cell, None)
+        self._ranked = None
+
+    def set_bans(self, added=(), removed=()):
+        self.bans |= set(added)
+        self.bans -= set(removed)
+        self._ranked = None
+
+    def set_lane_enemy(self, champ: int | None):
+        if champ == self.lane_enemy:
+            return
+        picked = set(self.enemy_picks.values())
+        if self.lane_enemy in picked:
+            self._add_team(self.lane_enemy, +1)     # old lane opponent rejoins the team sums
+        if champ in picked:
+            self._add_team(champ, -1)
+        self.lane_enemy = champ
+        self._ranked = None
+
+    def set_role(self, role: str):
+        """ A different position means different counter pages: drop every row.
+        Picks whose row can't be loaded in the new role are dropped, then the
+        first error is raised. """
+        if role == self.role:
+            return
+        self.role = role
+        self._rows.clear()
+        error = None
+        for cell, enemy in list(self.enemy_picks.items()):
+            try:
+                self._row(enemy)
+            except ROW_ERRORS as e:
+                del self.enemy_picks[cell]
+                error = error or e
+        self._rebuild()
+        self.estimate_lane()
+        if error is not None:
+            raise error
+
+    def estimate_lane(self):
+        """ Lane opponent = the enemy most likely playing our role (needs role_meta). """
+        if self.role_meta is None:
+            return
+        roles = assign_roles(self.role_meta, self.enemy_picks.values()) if self.enemy_picks else {}
+        self.set_lane_enemy(roles.get(self.role))
+
+    def apply_delta(self, delta: ChampSelectDelta, session: dict | None = None) -> list[str]:
+        """ Feed a ChampSelectWatcher delta (champion ids) into the engine.
+        Returns what couldn't be applied; the rest of the delta still is. """
+        index = self.tensor.registry.index
+        errors = []
+        if delta.assigned_position:
+            try:
+                self.set_role(LCU_POSITION_TO_ROLE.get(delta.assigned_position, self.role))
+            except ROW_ERRORS as e:
+                errors.append(f"role {self.role}: {e}")
+        for cell, champ_id in delta.enemy_picks.items():
+            try:
+                self.set_enemy_pick(cell, index(champ_id) if champ_id else -1)
+            except ROW_ERRORS as e:
+                errors.append(f"enemy pick {self.tensor.registry.name(champ_id, f'#{champ_id}')}: {e}")
+        if delta.enemy_picks:
+            self.estimate_lane()
+        for cell, champ_id in delta.ally_picks.items():
+            self.set_ally_pick(cell, index(champ_id) if champ_id else -1)
+        if delta.bans_added or delta.bans_removed:
+            self.set_bans({index(c) for c in delta.bans_added}, {index(c) for c in delta.bans_removed})
+        return errors
+
+    # --- answer ----------------------------------------------------------
+    def recommend(self) -> list[tuple[str, float, float, float]]:
+        """ [(name, score, lane wr, team wr), ...] for available pool champions, best first. """
+        if self._ranked is not None:
+            return self._ranked
+
+        lane_wr = self._row(self.lane_enemy) if self.lane_enemy in self.enemy_picks.values() \
+            else np.full(len(self.pool), np.nan)
+        score = combine_scores(lane_wr, self._team_sum, self._team_cnt, len(self._team_enemies()),
+                               self.lane_weight, self.team_weight)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            team_wr = self._team_sum / self._team_cnt
+
+        taken = self.bans | set(self.ally_picks.values()) | set(self.enemy_picks.values())
+        available = ~np.isin(self.pool, list(taken)) & ~np.isnan(score)
+        order = [i for i in np.argsort(-np.nan_to_num(score, nan=-np.inf), kind="stable") if available[i]]
+        names = self.tensor.registry.names
+        self._ranked = [(names[self.pool[i]], float(score[i]), float(lane_wr[i]), float(team_wr[i]))
+                        for i in order]
+        return self._ranked
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Live pick recommendations during champ select")
+    ap.add_argument("--pool", default="champion_pool.txt", help="Path to your champion pool file")
+    ap.add_argument("--role", default="top", choices=ROLES, help="Role until the client assigns one")
+    ap.add_argument("--lockfile", default=LOCKFILE_PATH, help="Path to the League client lockfile")
+    add_profile_argument(ap)
+    args = ap.parse_args()
+    profile_from_args(args)
+
+    pool = [c.strip() for c in pathlib.Path(args.pool).read_text().splitlines() if c.strip()]
+    role_meta = get_role_meta(build=False)
+    if role_meta is None:
+        print("No role meta for this patch yet (`python -m utils.role_meta`), "
+              "every enemy counts as a team pick")
+    engine = DraftEngine(pool, args.role, role_meta=role_meta)
+
+    def on_change(delta: ChampSelectDelta, session: dict | None):
+        if delta.ended:
+            save_tensor(engine.tensor)
+            return
+        for error in engine.apply_delta(delta, session):
+            print(f"skipped {error}")
+        print(tabulate(engine.recommend()[:10], headers=["Champion", "Score", "Lane WR %", "Team WR %"],
+                       floatfmt=".2f"))
+        print()
+
+    watcher = ChampSelectWatcher(read_lockfile(args.lockfile), on_change)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
+    save_tensor(engine.tensor)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,142 @@
-import os, time, hashlib, requests
+import os, glob
+from typing import Callable
 
+from utils import http_client, profiling
 from utils.patch import get_effective_patch, HEADERS
+from utils.cache_store import CacheStore, Revalidator
 
+UGG_BASE_URL = os.environ.get("UGG_BASE_URL", "https://u.gg")   # e.g. a local stand-in
 CACHE_DIR = "./cache"
 CACHE_PERIOD = 60 * 60 * 24 * 3  # 3 days
+ROLES = ("top", "jungle", "mid", "adc", "support")  # u.gg role slugs
+# other spellings the CLIs and the LCU use
+ROLE_ALIASES = {"middle": "mid", "mid-lane": "mid", "top-lane": "top", "jg": "jungle", "jungler": "jungle",
+                "bot": "adc", "bottom": "adc", "carry": "adc", "utility": "support", "supp": "support",
+                "sup": "support"}
+DEFAULT_RANK = "emerald_plus"
+HTML_CACHE_MAX_BYTES = 256 * 1024 * 1024  # compressed, LRU-evicted past this
+# expired cache entries are served at once and refreshed in the background; the
+# daemon turns it on - a one-shot CLI would only wait for the refresh at exit
+STALE_WHILE_REVALIDATE = False
+
+HTML_CACHE = CacheStore(os.path.join(CACHE_DIR, "html"), max_bytes=HTML_CACHE_MAX_BYTES)
+# every store whose entries are tagged with a patch and die with it
+PATCH_SCOPED_STORES = [HTML_CACHE]
+# called with the new patch tag before purge_superseded drops anything, e.g. to archive it
+PURGE_HOOKS: list[Callable[[str], None]] = []
+REVALIDATOR = Revalidator()
+_purged_for_patch = None
+
+
+def get_patch_tag() -> str:
+    """ Effective patch in u.gg's url format, '15.9.1' -> '15_9' """
+    return get_effective_patch().replace(".", "_").rsplit("_", 1)[0]
+
+
+def purge_superseded(patch_tag: str):
+    """ Once per process and patch: drop entries of older patches from every
+    patch scoped store, plus the uncompressed ./cache/*.html files of the
+    old cache layout. """
+    global _purged_for_patch
+    if not patch_tag or _purged_for_patch == patch_tag:
+        return
+    for hook in PURGE_HOOKS:
+        hook(patch_tag)
+    for store in PATCH_SCOPED_STORES:
+        store.purge_patches(keep={patch_tag})
+    for legacy_page in glob.glob(os.path.join(CACHE_DIR, "*.html")):
+        try:
+            os.remove(legacy_page)
+        except OSError:
+            pass
+    _purged_for_patch = patch_tag
+
+
+def normalize_role(role: str | None) -> str | None:
+    """ u.gg role slug for any accepted spelling ('Middle', 'bot', 'top-lane'); None stays None. """
+    if role is None:
+        return None
+    slug = role.strip().lower()
+    slug = ROLE_ALIASES.get(slug, slug)
+    if slug not in ROLES:
+        raise ValueError(f"Unknown role '{role}', expected one of {', '.join(ROLES)}")
+    return slug
+
+
+def role_index(role: str) -> int:
+    """ Position of ``role`` (any accepted spelling) in ROLES. """
+    return ROLES.index(normalize_role(role))
+
+
+def counter_cache_key(champ: str, role: str | None, patch_tag: str | None, rank: str = DEFAULT_RANK) -> str:
+    return f"{patch_tag}_{champ.lower()}_{normalize_role(role) or 'norole'}_{rank}"
+
+
+def counter_page_url(champ: str, role: str | None, patch_tag: str | None, rank: str = DEFAULT_RANK) -> str:
+    base = f"{UGG_BASE_URL}/lol/champions/{champ}/counter"
+    params = []
+    if role:
+        params.append(f"role={normalize_role(role)}")
+    if patch_tag:
+        params.append(f"patch={patch_tag}")
+    params.append(f"rank={rank}")
+    return base + "?" + "&".join(params)
+
+
+def stale_ok(stale: bool | None) -> bool:
+    """ Per-call override of STALE_WHILE_REVALIDATE (None = module setting). """
+    return STALE_WHILE_REVALIDATE if stale is None else stale
+
+
 def fetch_champ_counter_ugg(
         champ: str,
         role: str | None = None,
         add_patch: bool = True,
-        use_cache: bool = False
+        use_cache: bool = False,
+        stale: bool | None = None,
+        rank: str = DEFAULT_RANK
 ) -> str:
     """
     champ      – champion slug, e.g. 'aatrox'
-    role       – lane/position slug; if None the param is omitted
+    role       – lane/position (any ROLE_ALIASES spelling); if None the param is omitted
     add_patch  – include ?patch=x_y in URL
     use_cache  – read/write html cache
+    stale      – with use_cache, return an expired page and refresh it in the
+                 background (default: STALE_WHILE_REVALIDATE)
+    rank       – u.gg rank filter, sent as ?rank=
     """
-    os.makedirs(CACHE_DIR, exist_ok=True)
+    return get_counter_page(champ, role, add_patch, use_cache, stale, rank)[0]
 
+
+def get_counter_page(champ: str, role: str | None = None, add_patch: bool = True,
+                     use_cache: bool = False, stale: bool | None = None,
+                     rank: str = DEFAULT_RANK) -> tuple[str, bool]:
+    """ fetch_champ_counter_ugg that also says whether the page is fresh: (html, fresh) """
+    role = normalize_role(role)
+    with profiling.span("ugg.fetch_counter", champ=champ, role=role):
+        return _get_counter_page(champ, role, add_patch, use_cache, stale_ok(stale), rank)
+
+
+def _get_counter_page(champ: str, role: str | None, add_patch: bool, use_cache: bool,
+                      stale: bool, rank: str) -> tuple[str, bool]:
     # build cache-key
-    patch_tag = get_effective_patch().replace(".", "_").rsplit("_", 1)[0] if add_patch else None
-    role_tag  = role or "norole"
-    key  = f"{patch_tag}_{champ.lower()}_{role_tag}"
-    path = os.path.join(CACHE_DIR, f"{key}.html")
+    patch_tag = get_patch_tag() if add_patch else None
+    key = counter_cache_key(champ, role, patch_tag, rank)
 
-    if use_cache and os.path.exists(path) and (time.time() - os.path.getmtime(path)) < CACHE_PERIOD:
-        return open(path, encoding="utf-8").read()
+    purge_superseded(patch_tag)
 
-    # --- build URL ----------------------------------------------------------
-    base = f"https://u.gg/lol/champions/{champ}/counter"
-    params = []
-    if role:
-        params.append(f"role={role}")
-    if add_patch:
-        params.append(f"patch={patch_tag}")
-    url = base + ("?" + "&".join(params) if params else "")
-    # ----------------------------------------------------------------------
+    if use_cache:
+        cached, age = HTML_CACHE.get_with_age(key) if stale else \
+            (HTML_CACHE.get(key, max_age=CACHE_PERIOD), 0.0)
+        if cached is not None:
+            if age >= CACHE_PERIOD:
+                profiling.count("swr.stale_served")
+                REVALIDATOR.submit(f"html:{key}", lambda: get_counter_page(
+                    champ, role, add_patch, use_cache=True, stale=False, rank=rank))
+            return cached.decode("utf-8"), age < CACHE_PERIOD
 
-    r = requests.get(url, headers=HEADERS, timeout=10)
+    r = http_client.get(counter_page_url(champ, role, patch_tag, rank), headers=HEADERS)
     r.raise_for_status()
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(r.text)
-    return r.text
\ No newline at end of file
+    HTML_CACHE.put(key, r.text.encode("utf-8"), patch=patch_tag)
+    return r.text, True
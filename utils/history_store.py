@@ -0,0 +1,247 @@
+"""
+Matchups of every patch we have seen, in one indexed SQLite file.
+
+    python -m utils.history_store ingest                          # loaded tensors + matchup cache
+    python -m utils.history_store trend --enemy darius --role top --last 5
+    python -m utils.history_store blend --enemy darius --role top --last 3 --decay 0.7
+
+Rows come from already parsed data - the matchup tensors and MATCHUP_CACHE -
+never from html. A superseded patch's tensor is ingested by get_tensor
+right before it deletes the file, and its MATCHUP_CACHE entries right
+before purge_superseded drops them, so history builds up on its own.
+
+Patches are stored as integers (15_9 -> 1509) so "last N patches" sorts
+numerically.
+"""
+import argparse, os, pathlib, sqlite3, sys, threading, time
+
+import numpy as np
+from tabulate import tabulate
+
+from utils.champion_registry import get_registry
+from utils.fetch_ugg import CACHE_DIR, ROLES, get_patch_tag
+from utils.parse_ugg_ssr import DEFAULT_RANK, MATCHUP_CACHE, MATCHUP_FIELDS, _unpack_matchups
+
+HISTORY_PATH = os.path.join(CACHE_DIR, "history.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matchups (
+    enemy    TEXT    NOT NULL,   -- champion whose counter page this is
+    role     TEXT    NOT NULL,
+    rank     TEXT    NOT NULL,
+    patch    INTEGER NOT NULL,   -- 1509 for 15_9
+    pick     TEXT    NOT NULL,   -- champion the stats are for
+    wr       REAL,
+    gd15     REAL,
+    pickrate REAL,
+    matches  INTEGER,
+    PRIMARY KEY (enemy, role, rank, patch, pick)
+) WITHOUT ROWID;
+-- "how does my champion do vs everyone", covering so it never touches the table
+CREATE INDEX IF NOT EXISTS matchups_by_pick ON matchups (pick, role, rank, patch, enemy, wr, matches);
+-- what has been ingested, so re-ingesting a tensor only writes rows that changed
+CREATE TABLE IF NOT EXISTS sources (
+    enemy     TEXT    NOT NULL,
+    role      TEXT    NOT NULL,
+    rank      TEXT    NOT NULL,
+    patch     INTEGER NOT NULL,
+    loaded_at REAL    NOT NULL,
+    PRIMARY KEY (enemy, role, rank, patch)
+) WITHOUT ROWID;
+"""
+
+
+def patch_number(patch_tag: str) -> int:
+    major, minor = patch_tag.split("_")[:2]
+    return int(major) * 100 + int(minor)
+
+
+def patch_tag_of(number: int) -> str:
+    return f"{number // 100}_{number % 100}"
+
+
+class HistoryStore:
+    def __init__(self, path: str = HISTORY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;" + SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    # --- ingestion -------------------------------------------------------
+    def _ingest_rows(self, sources: list[tuple], rows: list[tuple]):
+        """ sources: (enemy, role, rank, patch, loaded_at); rows: one per matchups column set """
+        with self._lock, self._db:
+            # a source's rows are replaced as a whole, so picks that dropped off its page go too
+            self._db.executemany("DELETE FROM matchups WHERE enemy = ? AND role = ? AND rank = ? AND patch = ?",
+                                 [s[:4] for s in sources])
+            self._db.executemany("INSERT OR REPLACE INTO matchups VALUES (?,?,?,?,?,?,?,?,?)", rows)
+            self._db.executemany("INSERT OR REPLACE INTO sources VALUES (?,?,?,?,?)", sources)
+
+    def ingest_matchups(self, enemy: str, role: str, rank: str, patch_tag: str,
+                        counters: dict[str, dict], loaded_at: float = 0.0):
+        """ One parse_ugg_matchups result. """
+        patch = patch_number(patch_tag)
+        rows = [(enemy, role, rank, patch, pick, *(stats[f] for f in MATCHUP_FIELDS))
+                for pick, stats in counters.items()]
+        self._ingest_rows([(enemy, role, rank, patch, loaded_at)], rows)
+
+    def ingested(self, rank: str, patch_tag: str) -> dict[tuple[str, str], float]:
+        """ {(enemy, role): loaded_at} already stored for a patch """
+        cur = self._db.execute("SELECT enemy, role, loaded_at FROM sources WHERE rank = ? AND patch = ?",
+                               (rank, patch_number(patch_tag)))
+        return {(enemy, role): loaded_at for enemy, role, loaded_at in cur}
+
+    def ingest_arrays(self, names: list[str], patch_tag: str, rank: str,
+                      stats: np.ndarray, loaded_at: np.ndarray) -> int:
+        """
+        Every loaded (role, enemy) row of a tensor's ``stats[field, role,
+        enemy, pick]`` that is newer than what's stored. Returns rows written.
+        """
+        done = self.ingested(rank, patch_tag)
+        patch = patch_number(patch_tag)
+        sources, rows = [], []
+        for r, e in zip(*np.nonzero(loaded_at > 0)):
+            role, enemy = ROLES[r], names[e]
+            if done.get((enemy, role), 0) >= loaded_at[r, e]:
+                continue
+            block = stats[:, r, e, :]
+            picks = np.flatnonzero(~np.isnan(block[0]))
+            sources.append((enemy, role, rank, patch, float(loaded_at[r, e])))
+            rows += [(enemy, role, rank, patch, names[p], *(float(v) for v in block[:3, p]), int(block[3, p]))
+                     for p in picks]
+        self._ingest_rows(sources, rows)
+        return len(rows)
+
+    def ingest_tensor(self, tensor) -> int:
+        return self.ingest_arrays(tensor.registry.names, tensor.patch_tag, tensor.rank,
+                                  tensor.stats, tensor.loaded_at)
+
+    def ingest_tensor_file(self, path: str, patch_tag: str, rank: str) -> int:
+        """ A saved tensor, possibly of an older patch; champion ids are named with today's registry. """
+        registry = get_registry()
+        with np.load(path) as f:
+            names = [registry.name(int(cid), f"#{cid}") for cid in f["ids"]]
+            return self.ingest_arrays(names, patch_tag, rank, f["stats"], f["loaded_at"])
+
+    def ingest_matchup_cache(self, skip_patch: str | None = None) -> int:
+        """ Every MATCHUP_CACHE entry (keys: {patch_tag}_{slug}_{role}_{rank}),
+        except those of ``skip_patch``. """
+        registry = get_registry()
+        count = 0
+        for key in MATCHUP_CACHE.keys():
+            major, minor, slug, role, rank = key.split("_", 4)
+            if f"{major}_{minor}" == skip_patch:
+                continue
+            blob = MATCHUP_CACHE.get(key)
+            i = registry.index_for_slug(slug)
+            if blob is None or i < 0:
+                continue
+            counters = _unpack_matchups(blob)
+            self.ingest_matchups(registry.names[i], role, rank, f"{major}_{minor}", counters,
+                                 time.time() - (MATCHUP_CACHE.age(key) or 0.0))
+            count += len(counters)
+        return count
+
+    # --- queries ---------------------------------------------------------
+    def patches(self, rank: str = DEFAULT_RANK) -> list[str]:
+        cur = self._db.execute("SELECT DISTINCT patch FROM sources WHERE rank = ? ORDER BY patch", (rank,))
+        return [patch_tag_of(p) for (p,) in cur]
+
+    def trend(self, picks: list[str], enemy: str, role: str, rank: str = DEFAULT_RANK,
+              last: int = 5) -> dict[str, list[tuple[str, float, int]]]:
+        """ {pick: [(patch_tag, wr, matches), ...] oldest first} over the last ``last`` stored patches """
+        recent = [patch_number(p) for p in self.patches(rank)[-last:]]
+        if not recent or not picks:
+            return {}
+        marks = ",".join("?" * len(picks))
+        cur = self._db.execute(
+            f"SELECT pick, patch, wr, matches FROM matchups "
+            f"WHERE enemy = ? AND role = ? AND rank = ? AND patch >= ? AND pick IN ({marks}) "
+            f"ORDER BY pick, patch", (enemy, role, rank, recent[0], *picks))
+        out: dict[str, list] = {}
+        for pick, patch, wr, matches in cur:
+            out.setdefault(pick, []).append((patch_tag_of(patch), wr, matches))
+        return out
+
+    def blend(self, picks: list[str], enemy: str, role: str, rank: str = DEFAULT_RANK,
+              last: int = 3, decay: float = 1.0) -> list[tuple[str, float, int]]:
+        """
+        [(pick, wr, matches), ...] best first: each pick's win rate over the
+        last ``last`` patches weighted by games, a patch ``k`` patches old
+        counting ``decay ** k`` as much.
+        """
+        recent = [patch_number(p) for p in self.patches(rank)[-last:]]
+        age = {p: len(recent) - 1 - k for k, p in enumerate(recent)}
+        blended = []
+        for pick, series in self.trend(picks, enemy, role, rank, last).items():
+            w = np.array([m * decay ** age[patch_number(t)] for t, _, m in series], dtype=float)
+            wr = np.array([v for _, v, _ in series], dtype=float)
+            if w.sum() > 0:
+                blended.append((pick, float((w * wr).sum() / w.sum()), int(sum(m for _, _, m in series))))
+        return sorted(blended, key=lambda b: -b[1])
+
+
+_store: HistoryStore | None = None
+
+
+def get_history_store() -> HistoryStore:
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
+
+
+def archive_matchup_cache(patch_tag: str):
+    """ MATCHUP_CACHE entries of every patch but ``patch_tag``; runs right before purge_superseded drops them. """
+    try:
+        get_history_store().ingest_matchup_cache(skip_patch=patch_tag)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"could not archive superseded matchups: {e}", file=sys.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Matchup history across patches")
+    ap.add_argument("command", choices=["ingest", "trend", "blend", "patches"])
+    ap.add_argument("--enemy", help="Enemy champion (counter page)")
+    ap.add_argument("--role", default="top", choices=ROLES)
+    ap.add_argument("--rank", default=DEFAULT_RANK)
+    ap.add_argument("--pool", default="champion_pool.txt", help="Path to your champion pool file")
+    ap.add_argument("--last", type=int, default=5, help="Number of most recent patches")
+    ap.add_argument("--decay", type=float, default=1.0, help="Weight factor per patch of age (blend)")
+    args = ap.parse_args()
+
+    store = get_history_store()
+    if args.command == "ingest":
+        from utils.matchup_tensor import get_tensor
+        rows = store.ingest_matchup_cache()
+        for path in pathlib.Path(CACHE_DIR).glob(f"tensor_{get_patch_tag()}_*.npz"):
+            rows += store.ingest_tensor(get_tensor(path.stem.split("_", 3)[3]))
+        print(f"{rows} rows written; patches stored: {', '.join(store.patches(args.rank))}")
+        return
+    if args.command == "patches":
+        print(", ".join(store.patches(args.rank)))
+        return
+    if not args.enemy:
+        ap.error(f"{args.command} needs --enemy")
+
+    registry = get_registry()
+    enemy = registry.names[registry.index_for_name(args.enemy)] if registry.index_for_name(args.enemy) >= 0 \
+        else args.enemy
+    pool = [registry.names[i] for i in (registry.index_for_name(c.strip())
+            for c in pathlib.Path(args.pool).read_text().splitlines() if c.strip()) if i >= 0]
+    if args.command == "trend":
+        trend = store.trend(pool, enemy, args.role, args.rank, args.last)
+        patches = store.patches(args.rank)[-args.last:]
+        rows = [[pick] + [dict((t, wr) for t, wr, _ in series).get(p) for p in patches]
+                for pick, series in trend.items()]
+        print(tabulate(rows, headers=["Champion"] + patches, floatfmt=".2f", missingval="-"))
+    else:
+        print(tabulate(store.blend(pool, enemy, args.role, args.rank, args.last, args.decay),
+                       headers=["Champion", f"Blended WR % vs {enemy}", "Matches"], floatfmt=".2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import asyncio, random, threading, time, weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from utils import profiling
+
+try:
+    import h2  # noqa: F401  - optional, enables HTTP/2 when installed
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+HTTPError = httpx.HTTPError  # what callers catch instead of importing httpx
+
+DEFAULT_TIMEOUT = 10.0
+HOST_TIMEOUTS = {
+    "u.gg": 15.0,                                    # big SSR pages
+    "ddragon.leagueoflegends.com": 10.0,
+    "support-leagueoflegends.riotgames.com": 10.0,
+    "127.0.0.1": 5.0,                                # League client (LCU)
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5   # seconds, doubled per attempt
+BACKOFF_CAP = 8.0
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+# connection-specific headers; the pool manages connections, and h2 rejects these outright
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade", "te"}
+
+_lock = threading.Lock()
+_clients: dict[bool, httpx.Client] = {}                    # verify -> client
+# loop -> {verify: client}; weak, so a later loop reusing an id never gets a dead loop's client
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[bool, httpx.AsyncClient]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def timeout_for(url: str) -> float:
+    return HOST_TIMEOUTS.get(urlsplit(url).hostname or "", DEFAULT_TIMEOUT)
+
+
+def backoff_delay(attempt: int, response: httpx.Response | None = None) -> float:
+    """ Retry-After when the server sends one, otherwise full-jitter exponential backoff. """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_CAP)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _request_headers(headers: dict | None) -> dict | None:
+    """ ``headers`` without hop-by-hop fields. """
+    if not headers:
+        return headers
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP}
+
+
+def get_client(verify: bool = True) -> httpx.Client:
+    """ Process wide keep-alive client. verify=False is only for the LCU's self-signed cert. """
+    client = _clients.get(verify)
+    if client is None:
+        with _lock:
+            client = _clients.get(verify)
+            if client is None:
+                client = httpx.Client(http2=HTTP2, verify=verify, limits=POOL_LIMITS,
+                                      follow_redirects=True)
+                _clients[verify] = client
+    return client
+
+
+def get_async_client(verify: bool = True) -> httpx.AsyncClient:
+    """ Keep-alive async client for the running event loop. """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(verify)
+    if client is None:
+        client = httpx.AsyncClient(http2=HTTP2, verify=verify, limits=POOL_LIMITS,
+                                   follow_redirects=True)
+        clients[verify] = client
+    return client
+
+
+def get(url: str, *, headers: dict | None = None, params: dict | None = None,
+        timeout: float | None = None, verify: bool = True,
+        retries: int = MAX_RETRIES) -> httpx.Response:
+    """
+    GET through the shared pool. 429/5xx and transport errors are retried
+    up to ``retries`` times with jittered backoff; the last response is
+    returned as-is, so callers still raise_for_status() themselves.
+    """
+    client = get_client(verify)
+    timeout = timeout or timeout_for(url)
+    headers = _request_headers(headers)
+    with profiling.span("http.get", host=urlsplit(url).hostname) as s:
+        for attempt in range(retries + 1):
+            if attempt:
+                profiling.count("http.retries")
+            try:
+                response = client.get(url, headers=headers, params=params, timeout=timeout)
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                _count_response(s, response)
+                return response
+            time.sleep(backoff_delay(attempt, response))
+
+
+async def async_get(url: str, *, headers: dict | None = None, params: dict | None = None,
+                    timeout: float | None = None, verify: bool = True,
+                    retries: int = MAX_RETRIES) -> httpx.Response:
+    """ async twin of get() """
+    client = get_async_client(verify)
+    timeout = timeout or timeout_for(url)
+    headers = _request_headers(headers)
+    start = time.perf_counter_ns()
+    for attempt in range(retries + 1):
+        if attempt:
+            profiling.count("http.retries")
+        try:
+            response = await client.get(url, headers=headers, params=params, timeout=timeout)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == retries:
+            if profiling.is_enabled():
+                # coroutines interleave on one thread, so no span stack here
+                args = {"host": urlsplit(url).hostname}
+                _count_response(args, response)
+                profiling.record("http.async_get", start, time.perf_counter_ns() - start, args=args)
+            return response
+        await asyncio.sleep(backoff_delay(attempt, response))
+
+
+def _count_response(span, response: httpx.Response):
+    """ Status and body size onto a span (or args dict) and the http counters. """
+    if not profiling.is_enabled():
+        return
+    size = len(response.content)
+    profiling.count("http.requests")
+    profiling.count("http.bytes", size)
+    if isinstance(span, dict):
+        span.update(status=response.status_code, bytes=size)
+    else:
+        span.set(status=response.status_code, bytes=size)
+
+
+def close():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose():
+    """ Close the async client of the running loop. """
+    for client in _async_clients.pop(asyncio.get_running_loop(), {}).values():
+        await client.aclose()
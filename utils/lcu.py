@@ -0,0 +1,160 @@
+import base64, os, threading, time
+from dataclasses import dataclass
+
+import httpx
+
+from utils.http_client import HOST_TIMEOUTS
+
+LOCKFILE_PATH = 'D:/Games/Riot Games/League of Legends/lockfile'
+
+
+@dataclass(frozen=True)
+class Lockfile:
+    """ League client lockfile: ``name:pid:port:password:protocol`` """
+    name: str
+    pid: int
+    port: int
+    password: str
+    protocol: str = "https"
+
+    @property
+    def auth_header(self) -> dict[str, str]:
+        token = base64.b64encode(f'riot:{self.password}'.encode()).decode()
+        return {'Authorization': f'Basic {token}'}
+
+    @property
+    def base_url(self) -> str:
+        return f'{self.protocol}://127.0.0.1:{self.port}'
+
+    @property
+    def ws_url(self) -> str:
+        return f'{"wss" if self.protocol == "https" else "ws"}://127.0.0.1:{self.port}/'
+
+
+def parse_lockfile(content: str) -> Lockfile:
+    name, pid, port, password, protocol = content.strip().split(':')[:5]
+    return Lockfile(name, int(pid), int(port), password, protocol)
+
+
+def read_lockfile(path: str = LOCKFILE_PATH) -> Lockfile:
+    with open(path, 'r') as f:
+        return parse_lockfile(f.read())
+
+
+# --- persistent client ---------------------------------------------------
+LOCKFILE_CANDIDATES = (
+    LOCKFILE_PATH,
+    'C:/Riot Games/League of Legends/lockfile',
+    '/Applications/League of Legends.app/Contents/LoL/lockfile',
+)
+LOCKFILE_CHECK_INTERVAL = 2.0   # seconds between lockfile stat() calls
+RESPONSE_TTL = 0.5              # seconds a GET answer is reused
+
+# assignedPosition in the client -> u.gg role slug
+LCU_POSITION_TO_ROLE = {"top": "top", "jungle": "jungle", "middle": "mid",
+                        "bottom": "adc", "utility": "support"}
+
+
+def discover_lockfile() -> str:
+    """ $LCU_LOCKFILE, else the first known install location that exists. """
+    env = os.environ.get("LCU_LOCKFILE")
+    if env:
+        return env
+    for path in LOCKFILE_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError("League client lockfile not found - is the client running? "
+                            "Set LCU_LOCKFILE to its path.")
+
+
+class LCUClient:
+    """
+    Keep-alive connection to the local League client.
+
+    The lockfile is parsed once and only re-read when its mtime changes
+    (client restart -> new port and password), checked at most every
+    LOCKFILE_CHECK_INTERVAL. GET answers are reused for RESPONSE_TTL so
+    several callers reacting to the same update share one request.
+    """
+
+    def __init__(self, lockfile_path: str | None = None, ttl: float = RESPONSE_TTL):
+        self.lockfile_path = lockfile_path or discover_lockfile()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._lockfile: Lockfile | None = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._session: httpx.Client | None = None
+        self._responses: dict[str, tuple[float, object]] = {}
+
+    @property
+    def lockfile(self) -> Lockfile:
+        self._refresh_lockfile()
+        return self._lockfile
+
+    def _refresh_lockfile(self):
+        now = time.monotonic()
+        if self._lockfile is not None and now - self._checked_at < LOCKFILE_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            mtime = os.stat(self.lockfile_path).st_mtime
+            if mtime == self._mtime and self._lockfile is not None:
+                return
+            self._lockfile = read_lockfile(self.lockfile_path)
+            self._mtime = mtime
+            if self._session is not None:
+                self._session.close()
+            self._session = httpx.Client(base_url=self._lockfile.base_url,
+                                         headers={**self._lockfile.auth_header, "Accept": "application/json"},
+                                         verify=False, timeout=HOST_TIMEOUTS["127.0.0.1"])
+            self._responses.clear()
+
+    def get_json(self, path: str, max_age: float | None = None):
+        """ GET ``path``; None on 404 (e.g. no champ select running). """
+        max_age = self.ttl if max_age is None else max_age
+        self._refresh_lockfile()
+        cached = self._responses.get(path)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        r = self._session.get(path)
+        if r.status_code == 404:
+            data = None
+        else:
+            r.raise_for_status()
+            data = r.json()
+        self._responses[path] = (time.monotonic(), data)
+        return data
+
+    # --- typed accessors -------------------------------------------------
+    def champ_select_session(self) -> dict | None:
+        return self.get_json("/lol-champ-select/v1/session")
+
+    def gameflow_phase(self) -> str:
+        """ 'None', 'Lobby', 'ChampSelect', 'InProgress', ... """
+        return self.get_json("/lol-gameflow/v1/gameflow-phase") or "None"
+
+    def assigned_position(self) -> str | None:
+        """ Our u.gg role in the current champ select, None outside of it or in blind. """
+        session = self.champ_select_session()
+        if not session:
+            return None
+        cell = session.get("localPlayerCellId")
+        for p in session.get("myTeam", []):
+            if p.get("cellId") == cell:
+                return LCU_POSITION_TO_ROLE.get(p.get("assignedPosition", ""))
+        return None
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+_client: LCUClient | None = None
+
+
+def get_lcu_client() -> LCUClient:
+    global _client
+    if _client is None:
+        _client = LCUClient()
+    return _client
@@ -0,0 +1,137 @@
+"""
+Stand-in for the League client that replays recorded champ select sessions,
+for exercising the watcher and LCUClient without a running client.
+
+    python -m utils.lcu_mock data_examples/champselect.py --lockfile ./lockfile
+    python -m utils.lcu_watcher --lockfile ./lockfile
+
+A recording is a JSON list of sessions, JSON lines, or a python literal like
+data_examples/champselect.py. Each session is sent as one Update event
+(the first as Create), followed by a Delete when champ select "ends".
+Plain GETs on the same port answer the session and gameflow phase REST
+endpoints with whatever was last replayed.
+"""
+import argparse, ast, asyncio, json, secrets
+from http import HTTPStatus
+
+from websockets.asyncio.server import serve
+
+from utils.lcu import Lockfile
+from utils.lcu_watcher import CHAMP_SELECT_EVENT, WAMP_SUBSCRIBE, WAMP_EVENT
+
+SESSION_URI = "/lol-champ-select/v1/session"
+GAMEFLOW_URI = "/lol-gameflow/v1/gameflow-phase"
+
+
+def load_sessions(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        try:
+            data = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except ValueError:
+            data = ast.literal_eval(text)
+    return data if isinstance(data, list) else [data]
+
+
+class MockLCU:
+    def __init__(self, sessions: list[dict], interval: float = 0.5,
+                 password: str | None = None, port: int = 0, end_with_delete: bool = True):
+        self.sessions = sessions
+        self.interval = interval
+        self.password = password or secrets.token_urlsafe(16)
+        self.port = port
+        self.end_with_delete = end_with_delete
+        self.session: dict | None = None    # last replayed session, served over REST
+        self._server = None
+
+    @property
+    def lockfile(self) -> Lockfile:
+        return Lockfile("LeagueClient", 0, self.port, self.password, "http")
+
+    def write_lockfile(self, path: str):
+        with open(path, "w") as f:
+            lf = self.lockfile
+            f.write(f"{lf.name}:{lf.pid}:{lf.port}:{lf.password}:{lf.protocol}")
+
+    async def start(self) -> Lockfile:
+        self._server = await serve(self._handler, "127.0.0.1", self.port, subprotocols=["wamp"],
+                                   process_request=self._rest)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.lockfile
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _authorised(self, request) -> bool:
+        return request.headers.get("Authorization") == self.lockfile.auth_header["Authorization"]
+
+    def _rest(self, connection, request):
+        """ Answer non-upgrade requests like the client's REST API would. """
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return None
+        if not self._authorised(request):
+            status, body = HTTPStatus.UNAUTHORIZED, {"message": "bad credentials"}
+        elif request.path == SESSION_URI and self.session is not None:
+            status, body = HTTPStatus.OK, self.session
+        elif request.path == GAMEFLOW_URI:
+            status, body = HTTPStatus.OK, "ChampSelect" if self.session is not None else "None"
+        else:
+            status, body = HTTPStatus.NOT_FOUND, {"message": f"{request.path} not found"}
+        response = connection.respond(status, json.dumps(body))
+        del response.headers["Content-Type"]
+        response.headers["Content-Type"] = "application/json"
+        return response
+
+    async def _handler(self, ws):
+        if not self._authorised(ws.request):
+            await ws.close(1008, "bad credentials")
+            return
+
+        async for message in ws:
+            frame = json.loads(message)
+            if frame == [WAMP_SUBSCRIBE, CHAMP_SELECT_EVENT]:
+                break
+        else:
+            return
+
+        for i, session in enumerate(self.sessions):
+            self.session = session
+            event = {"data": session, "eventType": "Create" if i == 0 else "Update", "uri": SESSION_URI}
+            await ws.send(json.dumps([WAMP_EVENT, CHAMP_SELECT_EVENT, event]))
+            await asyncio.sleep(self.interval)
+        if self.end_with_delete:
+            self.session = None
+            event = {"data": None, "eventType": "Delete", "uri": SESSION_URI}
+            await ws.send(json.dumps([WAMP_EVENT, CHAMP_SELECT_EVENT, event]))
+        await ws.wait_closed()
+
+
+async def _serve_forever(mock: MockLCU, lockfile_path: str):
+    await mock.start()
+    mock.write_lockfile(lockfile_path)
+    print(f"mock LCU on ws://127.0.0.1:{mock.port}/, lockfile written to {lockfile_path}")
+    await asyncio.Event().wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay recorded champ select sessions over a fake LCU websocket")
+    ap.add_argument("recording", help="Recorded session(s)")
+    ap.add_argument("--lockfile", default="./lockfile", help="Where to write the fake lockfile")
+    ap.add_argument("--port", type=int, default=0, help="Port (default: any free one)")
+    ap.add_argument("--interval", type=float, default=1.0, help="Seconds between events")
+    args = ap.parse_args()
+
+    mock = MockLCU(load_sessions(args.recording), args.interval, port=args.port)
+    try:
+        asyncio.run(_serve_forever(mock, args.lockfile))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Live champ select updates from the League client's WAMP websocket.
+
+    python -m utils.lcu_watcher                     # real client, default lockfile
+    python -m utils.lcu_watcher --lockfile ./lockfile
+
+The client pushes the whole session on every change; ChampSelectWatcher keeps
+the last one and hands callers only what changed (ChampSelectDelta).
+"""
+import argparse, asyncio, json, ssl, sys
+from dataclasses import dataclass, field
+from typing import Callable
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from utils.lcu import Lockfile, read_lockfile, LOCKFILE_PATH
+
+CHAMP_SELECT_EVENT = "OnJsonApiEvent_lol-champ-select_v1_session"
+WAMP_SUBSCRIBE = 5
+WAMP_EVENT = 8
+
+
+@dataclass
+class ChampSelectDelta:
+    """ What one session event changed. Champion id 0 means "no champion". """
+    started: bool = False
+    ended: bool = False
+    ally_picks: dict[int, int] = field(default_factory=dict)    # cellId -> championId
+    enemy_picks: dict[int, int] = field(default_factory=dict)   # cellId -> championId
+    bans_added: set[int] = field(default_factory=set)
+    bans_removed: set[int] = field(default_factory=set)
+    assigned_position: str | None = None                         # set when it changed
+    phase: str | None = None                                     # set when it changed
+
+    def __bool__(self):
+        return bool(self.started or self.ended or self.ally_picks or self.enemy_picks
+                    or self.bans_added or self.bans_removed
+                    or self.assigned_position is not None or self.phase is not None)
+
+
+def _picks(session: dict | None, team: str) -> dict[int, int]:
+    if not session:
+        return {}
+    return {p["cellId"]: p.get("championId", 0) for p in session.get(team, [])}
+
+
+def _bans(session: dict | None) -> set[int]:
+    if not session:
+        return set()
+    bans = set(session.get("bans", {}).get("myTeamBans", []))
+    bans |= set(session.get("bans", {}).get("theirTeamBans", []))
+    for turn in session.get("actions", []):
+        for action in turn:
+            if action.get("type") == "ban" and action.get("completed"):
+                bans.add(action.get("championId", 0))
+    bans.discard(0)
+    return bans
+
+
+def _assigned_position(session: dict | None) -> str:
+    if not session:
+        return ""
+    cell = session.get("localPlayerCellId")
+    for p in session.get("myTeam", []):
+        if p.get("cellId") == cell:
+            return p.get("assignedPosition", "")
+    return ""
+
+
+def _phase(session: dict | None) -> str:
+    return (session or {}).get("timer", {}).get("phase", "")
+
+
+def diff_sessions(old: dict | None, new: dict | None) -> ChampSelectDelta:
+    delta = ChampSelectDelta(started=old is None and new is not None,
+                             ended=old is not None and new is None)
+    for team, out in (("myTeam", delta.ally_picks), ("theirTeam", delta.enemy_picks)):
+        before, after = _picks(old, team), _picks(new, team)
+        for cell in before.keys() | after.keys():
+            if before.get(cell, 0) != after.get(cell, 0):
+                out[cell] = after.get(cell, 0)
+    old_bans, new_bans = _bans(old), _bans(new)
+    delta.bans_added = new_bans - old_bans
+    delta.bans_removed = old_bans - new_bans
+    if _assigned_position(old) != _assigned_position(new):
+        delta.assigned_position = _assigned_position(new)
+    if _phase(old) != _phase(new):
+        delta.phase = _phase(new)
+    return delta
+
+
+class ChampSelectWatcher:
+    """
+    Subscribes to the champ select session event and calls
+    ``on_change(delta, session)`` for every event that changed something.
+    Messages are handled in a worker thread, one at a time, so a callback
+    that fetches pages doesn't stall the websocket; a callback that raises
+    is logged and the watcher keeps going.
+    """
+
+    def __init__(self, lockfile: Lockfile,
+                 on_change: Callable[[ChampSelectDelta, dict | None], None]):
+        self.lockfile = lockfile
+        self.on_change = on_change
+        self.session: dict | None = None
+        self._stop = asyncio.Event()
+
+    def apply_event(self, payload: dict) -> ChampSelectDelta:
+        """ Apply one ``{"eventType", "uri", "data"}`` event to the held session. """
+        new = None if payload.get("eventType") == "Delete" else payload.get("data")
+        delta = diff_sessions(self.session, new)
+        self.session = new
+        if delta:
+            try:
+                self.on_change(delta, new)
+            except Exception as e:
+                print(f"champ select update failed: {e!r}", file=sys.stderr)
+        return delta
+
+    def handle_message(self, message: str | bytes):
+        try:
+            frame = json.loads(message)
+        except ValueError:
+            return
+        if (isinstance(frame, list) and len(frame) == 3 and frame[0] == WAMP_EVENT
+                and frame[1] == CHAMP_SELECT_EVENT):
+            self.apply_event(frame[2])
+
+    def _ssl_context(self) -> ssl.SSLContext | None:
+        if not self.lockfile.ws_url.startswith("wss"):
+            return None
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE   # the client's cert is self-signed
+        return ctx
+
+    async def run(self):
+        """ Watch until stop() is called or the client goes away. """
+        async with connect(self.lockfile.ws_url, ssl=self._ssl_context(),
+                           additional_headers=self.lockfile.auth_header,
+                           subprotocols=["wamp"]) as ws:
+            await ws.send(json.dumps([WAMP_SUBSCRIBE, CHAMP_SELECT_EVENT]))
+            stop = asyncio.create_task(self._stop.wait())
+            try:
+                while not self._stop.is_set():
+                    recv = asyncio.create_task(ws.recv())
+                    done, _ = await asyncio.wait({recv, stop}, return_when=asyncio.FIRST_COMPLETED)
+                    if recv not in done:
+                        recv.cancel()
+                        break
+                    try:
+                        await asyncio.to_thread(self.handle_message, recv.result())
+                    except ConnectionClosed:
+                        break
+            finally:
+                stop.cancel()
+
+    def stop(self):
+        self._stop.set()
+
+
+def print_delta(delta: ChampSelectDelta, session: dict | None):
+    changes = {k: v for k, v in vars(delta).items() if v}
+    print(changes)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Print live champ select changes")
+    ap.add_argument("--lockfile", default=LOCKFILE_PATH, help="Path to the League client lockfile")
+    args = ap.parse_args()
+    watcher = ChampSelectWatcher(read_lockfile(args.lockfile), print_delta)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
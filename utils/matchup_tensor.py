@@ -0,0 +1,211 @@
+import os, sys, glob, sqlite3, time, threading
+import numpy as np
+
+from utils import profiling
+from utils.champion_registry import ChampionRegistry, get_registry
+from utils.fetch_ugg import CACHE_DIR, CACHE_PERIOD, REVALIDATOR, ROLES, get_patch_tag, role_index, stale_ok
+from utils.parse_ugg_ssr import load_matchups, DEFAULT_RANK, MATCHUP_FIELDS
+
+WR, GD15, PICKRATE, MATCHES = range(len(MATCHUP_FIELDS))
+
+
+class MatchupTensor:
+    """
+    Dense matchup store of one patch and rank bucket.
+
+    ``stats[field, role, enemy, pick]`` is how champion index ``pick`` does
+    against ``enemy`` in ``role`` (fields in MATCHUP_FIELDS order: wr, gd15,
+    pickrate, matches), taken from the enemy's u.gg counter page; NaN where
+    u.gg has no data. ``loaded_at[role, enemy]`` is when that counter page
+    was stored (0 = never), rows older than CACHE_PERIOD get reloaded - in
+    the background while STALE_WHILE_REVALIDATE keeps serving the old row.
+    Indices are ChampionRegistry indices; roles may be given in any
+    normalize_role spelling. A ``read_only`` tensor (e.g. mapped from a
+    snapshot bundle) never fetches: what it holds is all there is.
+    """
+
+    def __init__(self, registry: ChampionRegistry, patch_tag: str, rank: str = DEFAULT_RANK,
+                 stats: np.ndarray | None = None, loaded_at: np.ndarray | None = None,
+                 read_only: bool = False):
+        n = len(registry)
+        self.registry = registry
+        self.patch_tag = patch_tag
+        self.rank = rank
+        self.stats = stats if stats is not None else \
+            np.full((len(MATCHUP_FIELDS), len(ROLES), n, n), np.nan, dtype=np.float32)
+        self.loaded_at = loaded_at if loaded_at is not None else np.zeros((len(ROLES), n))
+        self.dirty = False  # rows added since the last save
+        self.read_only = read_only
+        self._fetched: set[tuple[int, int]] = set()   # (role, enemy) rows this process fetched bypassing the caches
+        self._lock = threading.Lock()
+
+    # --- filling ---------------------------------------------------------
+    def set_counters(self, enemy: int, role: str, counters: dict[str, dict], loaded_at: float | None = None):
+        """ Store parse_ugg_matchups output for ``enemy``'s counter page (loaded now unless told otherwise). """
+        r = role_index(role)
+        names = [name for name in counters if self.registry.index_for_name(name) >= 0]
+        picks = np.fromiter((self.registry.index_for_name(name) for name in names), dtype=np.intp)
+        values = np.array([[counters[name][f] for f in MATCHUP_FIELDS] for name in names],
+                          dtype=np.float32).reshape(-1, len(MATCHUP_FIELDS))
+        row = np.full((len(MATCHUP_FIELDS), len(self.registry)), np.nan, dtype=np.float32)
+        row[:, picks] = values.T
+        with self._lock:
+            # one assignment: lock-free readers never see the row blanked or half filled
+            self.stats[:, r, enemy, :] = row
+            self.loaded_at[r, enemy] = time.time() if loaded_at is None else loaded_at
+            self.dirty = True
+
+    def is_loaded(self, enemy: int, role: str) -> bool:
+        if self.read_only:
+            return self.loaded_at[role_index(role), enemy] > 0
+        return time.time() - self.loaded_at[role_index(role), enemy] < CACHE_PERIOD
+
+    def ensure(self, champion: dict, role: str, use_cache: bool = True) -> int:
+        """ Load ``champion``'s (alias map entry) counter page if missing; returns its index.
+        Without ``use_cache`` rows from disk or earlier runs are reloaded from u.gg
+        (once per process). """
+        enemy = self.registry.index_for_slug(champion["slug"])
+        if enemy < 0:
+            raise KeyError(f"{champion['name']} is not in the {self.registry.patch} registry")
+        r = role_index(role)
+        if self.is_loaded(enemy, role) and (use_cache or self.read_only or (r, enemy) in self._fetched):
+            profiling.count("tensor.row_hit")
+            return enemy
+        if self.read_only:
+            raise KeyError(f"no {role} counter data for {champion['name']} in this snapshot")
+        if use_cache and stale_ok(None) and self.loaded_at[r, enemy] > 0:
+            # expired row: keep answering with it while it's reloaded
+            profiling.count("swr.stale_served")
+            self._revalidate(champion, enemy, role)
+            return enemy
+
+        profiling.count("tensor.row_miss")
+        with profiling.span("tensor.load_row", champ=champion["slug"], role=role):
+            counters, stored_at = load_matchups(champion, role, self.rank, use_cache)
+        if not use_cache:
+            self._fetched.add((r, enemy))
+        # the row is as old as its page: stale data stays expired, so it is refreshed until that works
+        self.set_counters(enemy, role, counters, stored_at)
+        if time.time() - stored_at >= CACHE_PERIOD:
+            self._revalidate(champion, enemy, role)
+        return enemy
+
+    def _revalidate(self, champion: dict, enemy: int, role: str):
+        def reload():
+            counters, stored_at = load_matchups(champion, role, self.rank, use_cache=True, stale=False)
+            self.set_counters(enemy, role, counters, stored_at)
+            save_tensor(self)   # nothing else may save before the process exits
+
+        REVALIDATOR.submit(f"tensor:{self.patch_tag}_{self.rank}:{role}:{champion['slug']}", reload)
+
+    def ensure_role(self, role: str, use_cache: bool = True):
+        """ Load every champion's counter page for ``role`` (fills whole columns). """
+        for i, (name, slug) in enumerate(zip(self.registry.names, self.registry.slugs)):
+            if not self.is_loaded(i, role):
+                self.ensure({"name": name, "slug": slug}, role, use_cache)
+
+    # --- queries ---------------------------------------------------------
+    def indices(self, names) -> np.ndarray:
+        """ Registry indices of ``names`` (case-insensitive), unknown ones dropped. """
+        idx = (self.registry.index_for_name(n) for n in names)
+        return np.fromiter((i for i in idx if i >= 0), dtype=np.intp)
+
+    def row(self, enemy: int, role: str, field: int = WR) -> np.ndarray:
+        """ ``field`` for every pick against ``enemy`` """
+        return self.stats[field, role_index(role), enemy, :]
+
+    def column(self, pick: int, role: str, field: int = WR) -> np.ndarray:
+        """ ``field`` for ``pick`` against every enemy """
+        return self.stats[field, role_index(role), :, pick]
+
+    def best_vs(self, enemy: int, role: str, pool: np.ndarray) -> list[tuple[str, float, float, int]]:
+        """ Pool champions with data vs ``enemy``, best win rate first:
+        [(name, wr, gd15, matches), ...] """
+        block = self.stats[:, role_index(role), enemy, pool]        # (fields, len(pool))
+        have = ~np.isnan(block[WR])
+        picks, block = pool[have], block[:, have]
+        order = np.argsort(-block[WR], kind="stable")
+        return [(self.registry.names[picks[i]], float(block[WR, i]), float(block[GD15, i]),
+                 int(block[MATCHES, i])) for i in order]
+
+    def worst_enemies_for(self, pick: int, role: str, count: int = 10,
+                          min_matches: int = 0) -> list[tuple[str, float, int]]:
+        """ Enemies ``pick`` has the lowest win rate against: [(name, wr, matches), ...] """
+        wr = self.column(pick, role, WR)
+        matches = self.column(pick, role, MATCHES)
+        have = ~np.isnan(wr) & (np.nan_to_num(matches) >= min_matches)
+        enemies = np.flatnonzero(have)
+        order = enemies[np.argsort(wr[enemies], kind="stable")][:count]
+        return [(self.registry.names[e], float(wr[e]), int(matches[e])) for e in order]
+
+    # --- persistence -----------------------------------------------------
+    def save(self, path: str):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        with self._lock:
+            self.dirty = False   # rows set after this point mark it dirty again
+            np.savez(tmp_path, stats=self.stats, loaded_at=self.loaded_at,
+                     ids=np.asarray(self.registry.ids))
+            os.replace(tmp_path, path)   # inside the lock: saving threads share tmp_path
+
+    @classmethod
+    def load(cls, path: str, registry: ChampionRegistry, patch_tag: str,
+             rank: str = DEFAULT_RANK) -> "MatchupTensor":
+        with np.load(path) as f:
+            if not np.array_equal(f["ids"], np.asarray(registry.ids)):
+                raise ValueError("tensor was built for a different champion list")
+            return cls(registry, patch_tag, rank, f["stats"], f["loaded_at"])
+
+
+# --- one tensor per (patch, rank) per process -----------------------------
+_tensors: dict[tuple[str, str], MatchupTensor] = {}
+_tensors_lock = threading.Lock()
+
+
+def tensor_path(patch_tag: str, rank: str) -> str:
+    return os.path.join(CACHE_DIR, f"tensor_{patch_tag}_{rank}.npz")
+
+
+def add_tensor(tensor: MatchupTensor):
+    """ Make ``tensor`` the one get_tensor() returns for its patch and rank. """
+    with _tensors_lock:
+        _tensors[(tensor.patch_tag, tensor.rank)] = tensor
+
+
+def _archive(path: str, rank: str) -> bool:
+    """ Ingest a superseded tensor file into the history store; False when that failed. """
+    from utils.history_store import get_history_store   # imports this module
+    old_tag = os.path.basename(path)[len("tensor_"):-len(f"_{rank}.npz")]
+    try:
+        get_history_store().ingest_tensor_file(path, old_tag, rank)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"could not archive {path}, keeping it: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def get_tensor(rank: str = DEFAULT_RANK) -> MatchupTensor:
+    """ Tensor of the effective patch, restored from disk when possible. """
+    patch_tag = get_patch_tag()
+    tensor = _tensors.get((patch_tag, rank))
+    if tensor is not None:
+        return tensor
+    with _tensors_lock:   # concurrent first requests must share one tensor
+        tensor = _tensors.get((patch_tag, rank))
+        if tensor is not None:
+            return tensor
+        registry = get_registry()
+        # tensors of superseded patches go to the history store, then away
+        for old in glob.glob(os.path.join(CACHE_DIR, f"tensor_*_{rank}.npz")):
+            if old != tensor_path(patch_tag, rank) and _archive(old, rank):
+                os.remove(old)
+        try:
+            tensor = MatchupTensor.load(tensor_path(patch_tag, rank), registry, patch_tag, rank)
+        except (OSError, ValueError, KeyError):
+            tensor = MatchupTensor(registry, patch_tag, rank)
+        _tensors[(patch_tag, rank)] = tensor
+    return tensor
+
+
+def save_tensor(tensor: MatchupTensor):
+    if tensor.dirty:
+        tensor.save(tensor_path(tensor.patch_tag, tensor.rank))
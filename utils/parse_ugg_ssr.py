@@ -1,11 +1,41 @@
-import json
+import os, re, json, time
 
-from utils.fetch_ugg import fetch_champ_counter_ugg
+from utils import profiling
+from utils.cache_store import CacheStore
+from utils.champion_registry import ChampionRegistry, get_registry
+from utils.fetch_ugg import (counter_cache_key, get_counter_page, get_patch_tag, normalize_role,
+                             purge_superseded, stale_ok, CACHE_DIR, CACHE_PERIOD, DEFAULT_RANK, HTML_CACHE,
+                             PATCH_SCOPED_STORES, PURGE_HOOKS, REVALIDATOR)
+from utils.ssr_document import SSRDocument, SSR_KEY
 
+MATCHUP_FIELDS = ("wr", "gd15", "pickrate", "matches")
 
+# parsed parse_ugg_matchups results, keyed by patch/champion/role/rank
+MATCHUP_CACHE = CacheStore(os.path.join(CACHE_DIR, "matchups"), max_bytes=32 * 1024 * 1024)
+PATCH_SCOPED_STORES.append(MATCHUP_CACHE)
+
+
+def _archive_superseded(patch_tag: str):
+    """ Old patches' parsed matchups go to the history store before the purge drops them. """
+    if all(key.startswith(f"{patch_tag}_") for key in MATCHUP_CACHE.keys()):
+        return
+    from utils.history_store import archive_matchup_cache   # imports this module
+    archive_matchup_cache(patch_tag)
+
+
+PURGE_HOOKS.append(_archive_superseded)
+
+
+_json_decoder = json.JSONDecoder()
+
+
+@profiling.profiled("ssr.extract")
 def extract_json_from_html(html: str, key: str) -> dict:
     """ Extract JSON from HTML using a key
-        e.g. window.__SSR_DATA__ """
+        e.g. window.__SSR_DATA__
+        raw_decode parses from the opening brace and stops at the matching
+        closing one, so the end of the object is found by the C decoder
+        instead of a python-level character loop. """
     start = html.find(key)
     if start == -1:
         raise RuntimeError(f"{key} not found")
@@ -14,35 +44,25 @@ def extract_json_from_html(html: str, key: str) -> dict:
     if start == -1:
         raise RuntimeError(f"No opening brace after {key}")
 
-    brace_count = 0
-    in_str = False
-    escape = False
-
-    for i in range(start, len(html)):
-        c = html[i]
-        if c == '"' and not escape:
-            in_str = not in_str
-        elif not in_str:
-            if c == "{":
-                brace_count += 1
-            elif c == "}":
-                brace_count -= 1
-                if brace_count == 0:
-                    return json.loads(html[start:i + 1])
-        escape = (c == "\\" and not escape)
+    try:
+        obj, _end = _json_decoder.raw_decode(html, start)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"No closing brace found for {key}: {e}") from e
+    return obj
 
-    raise RuntimeError(f"No closing brace found for {key}")
 
-
-def get_ssr_subdata(ssr: dict, suffix: str):
+def get_ssr_subdata(ssr: dict | SSRDocument, suffix: str):
     """ Get first SSR block whose URL ends with given suffix """
+    if isinstance(ssr, SSRDocument):
+        return ssr.subdata(suffix)
     for url, block in ssr.items():
         if suffix in url:
             return block.get("data", {})
     raise KeyError(f"'{suffix}' not found in SSR data")
 
 
-def get_champion_matchup_info(champion_specific_ssr: dict, role: str):
+def get_champion_matchup_info(champion_specific_ssr: dict | SSRDocument, role: str,
+                              rank: str = DEFAULT_RANK):
     """ Return all info about a matchup with enemy laner for given role.
     example output:
     000 = {dict: 17}
@@ -66,38 +86,95 @@ def get_champion_matchup_info(champion_specific_ssr: dict, role: str):
     }
     """
 
-    champ_id_to_name = {}
-    for url, block in champion_specific_ssr.items():
-        if "champion_id" in url:
-            for cid, info in block["data"].items():
-                champ_id_to_name[int(cid)] = info["name"]
+    if isinstance(champion_specific_ssr, SSRDocument):
+        matchup_blocks = champion_specific_ssr.blocks_of_kind("matchups")
+    else:
+        matchup_blocks = ((url, block) for url, block in champion_specific_ssr.items()
+                          if "matchups" in url)
+
+    rank_and_role = get_rank_and_role_name(role, rank)
+    for url, block in matchup_blocks:
+        value = block.get("data", {}).get(rank_and_role)
+        if value is not None:
+            return value["counters"]
+    raise RuntimeError("Lane matchup block not found")
 
-    matchup_block = None
-    for url, block in champion_specific_ssr.items():
-        if "matchups" not in url:
-            continue
-        for key, value in block.get("data", {}).items():
-            if key == get_rank_and_role_name(role):
-                return value["counters"]
-    if not matchup_block:
-        raise RuntimeError("Lane matchup block not found")
 
+def get_rank_and_role_name(role, rank=DEFAULT_RANK):
+    return f"world_{rank}_{normalize_role(role)}"
 
-def get_rank_and_role_name(role):
-    return f"world_emerald_plus_{role.lower()}"
 
+def _pack_matchups(matchups: dict[str, dict]) -> bytes:
+    """ {enemy: {wr, gd15, pickrate, matches}} -> one row per enemy """
+    rows = [[name] + [stats[f] for f in MATCHUP_FIELDS] for name, stats in matchups.items()]
+    return json.dumps(rows, separators=(",", ":")).encode()
 
-def parse_ugg_matchups(champion: str, role: str) -> dict[str, dict]:
-    html = fetch_champ_counter_ugg(champion["slug"], role)
-    ssr = extract_json_from_html(html, "window.__SSR_DATA__")
-    champ_data = get_ssr_subdata(ssr, "en_US/champion.json")
 
-    champ_id_to_name = {int(info["key"]): info["name"] for info in champ_data.values()}
+def _unpack_matchups(blob: bytes) -> dict[str, dict]:
+    return {row[0]: dict(zip(MATCHUP_FIELDS, row[1:])) for row in json.loads(blob)}
 
-    matchups = get_champion_matchup_info(ssr, role)
+
+def parse_ugg_matchups(champion: dict, role: str, rank: str = DEFAULT_RANK,
+                       use_cache: bool = True, stale: bool | None = None) -> dict[str, dict]:
+    """
+    {enemy name: {wr, gd15, pickrate, matches}} for ``champion`` (alias map
+    entry) in ``role``. With use_cache the parsed result is served from
+    MATCHUP_CACHE, so warm queries never read or parse the html; ``stale``
+    as in fetch_champ_counter_ugg.
+    """
+    return load_matchups(champion, role, rank, use_cache, stale)[0]
+
+
+def load_matchups(champion: dict, role: str, rank: str = DEFAULT_RANK,
+                  use_cache: bool = True, stale: bool | None = None) -> tuple[dict[str, dict], float]:
+    """ parse_ugg_matchups that also says when its counter page was stored:
+    (matchups, stored_at), fresh while younger than CACHE_PERIOD """
+    role = normalize_role(role)
+    patch_tag = get_patch_tag()
+    purge_superseded(patch_tag)
+    key = f"{patch_tag}_{champion['slug']}_{role}_{rank}"
+    stale = stale_ok(stale)
+
+    if use_cache:
+        blob, age = MATCHUP_CACHE.get_with_age(key) if stale else \
+            (MATCHUP_CACHE.get(key, max_age=CACHE_PERIOD), MATCHUP_CACHE.age(key) or 0.0)
+        if blob is not None:
+            if age >= CACHE_PERIOD:
+                profiling.count("swr.stale_served")
+                REVALIDATOR.submit(f"matchups:{key}", lambda: load_matchups(
+                    champion, role, rank, use_cache=True, stale=False))
+            with profiling.span("matchups.unpack"):
+                return _unpack_matchups(blob), time.time() - age
+
+    html, fresh = get_counter_page(champion["slug"], role, use_cache=use_cache, stale=stale, rank=rank)
+    stored_at = time.time() - (HTML_CACHE.age(counter_cache_key(champion["slug"], role, patch_tag, rank)) or 0.0)
+    matchups = _parse_matchups_page(html, role, rank)
+    # a stale page is being refreshed; don't store what was parsed from it as fresh
+    if fresh:
+        # as old as the page it came from, so it expires with it
+        MATCHUP_CACHE.put(key, _pack_matchups(matchups), patch=patch_tag, stored_at=stored_at)
+    return matchups, stored_at
+
+
+def get_page_registry(ssr: SSRDocument) -> ChampionRegistry:
+    """ Registry of the static data patch the page was rendered with; the
+    page's champion.json block is only decoded if that patch isn't loaded. """
+    url = ssr.find("en_US/champion.json")
+    version = re.search(r"/(\d+\.\d+\.\d+)/", url)
+    if version is None:
+        return ChampionRegistry.from_champion_json("", ssr.subdata("en_US/champion.json"))
+    return get_registry(version.group(1), champion_json=lambda: ssr.subdata("en_US/champion.json"))
+
+
+@profiling.profiled("matchups.parse_page")
+def _parse_matchups_page(html: str, role: str, rank: str = DEFAULT_RANK) -> dict[str, dict]:
+    ssr = SSRDocument.from_html(html, SSR_KEY)
+    registry = get_page_registry(ssr)
+
+    matchups = get_champion_matchup_info(ssr, role, rank)
 
     return {
-        champ_id_to_name.get(c["champion_id"], f"#{c['champion_id']}"): {
+        registry.name(c["champion_id"], f"#{c['champion_id']}"): {
             "wr": round(100 - c.get("win_rate", 0), 2),
             "gd15": round(-c.get("gold_adv_15", 0), 2),
             "pickrate": round(c.get("pick_rate", 0), 2),
@@ -1,11 +1,21 @@
 import os
 import re
 import json
+import time
+import threading
 from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
 
-PATCH_META_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+from utils import http_client, profiling
+
+# overridable so benchmarks and offline runs can point at a local stand-in
+DDRAGON_BASE_URL = os.environ.get("DDRAGON_BASE_URL", "https://ddragon.leagueoflegends.com")
+PATCH_SCHEDULE_URL = os.environ.get(
+    "PATCH_SCHEDULE_URL",
+    "https://support-leagueoflegends.riotgames.com/hc/en-us/articles/360018987893-Patch-Schedule-League-of-Legends")
+PATCH_META_URL = f"{DDRAGON_BASE_URL}/api/versions.json"
+PATCH_INFO_PATH = "./cache/patch_info.json"
+PATCH_INFO_TTL = 60 * 60 * 6  # 6 hours
+PATCH_INFO_RETRY = 60 * 5     # seconds an offline answer is reused before asking Data Dragon again
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -16,14 +26,13 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.5",
     "Referer": "https://u.gg/",
     "DNT": "1",
-    "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
 }
 
 def get_latest_patches(count=2) -> list[str]:
     """Get the latest patches from Data Dragon API."""
     try:
-        response = requests.get(PATCH_META_URL, headers=HEADERS, timeout=10)
+        response = http_client.get(PATCH_META_URL, headers=HEADERS)
         all_patches = response.json()
 
         # Filter to only include standard patch formats (X.Y)
@@ -65,6 +74,7 @@ def convert_to_client_version(ddragon_version: str) -> str:
         return f"{client_major}.{parts[1]}"
     return ddragon_version
 
+@profiling.profiled("patch.schedule")
 def get_patch_release_dates() -> dict[str, str]:
     """
     Scrapes League of Legends patch release dates from the official website.
@@ -73,11 +83,12 @@ def get_patch_release_dates() -> dict[str, str]:
         A dictionary mapping patch numbers (e.g., "25.10") to their release dates
         in YYYY-MM-DD format
     """
+    from bs4 import BeautifulSoup   # only needed when patch_info.json is stale
+
     patches = {}
 
     try:
-        url = "https://support-leagueoflegends.riotgames.com/hc/en-us/articles/360018987893-Patch-Schedule-League-of-Legends"
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = http_client.get(PATCH_SCHEDULE_URL, headers=HEADERS)
 
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -171,14 +182,11 @@ def estimate_release_dates(patches: list[str]) -> dict[str, dict]:
 
     return result
 
-def get_effective_patch() -> str:
-    # Get the latest patches
-    latest_patches = get_latest_patches(2)
+def _pick_effective_patch(latest_patches: list[str], patch_info: dict[str, dict]) -> str:
     if not latest_patches:
         return ""
 
     current_patch = latest_patches[0]
-    patch_info = estimate_release_dates(latest_patches)
 
     # Get the release date for current patch
     current_patch_info = patch_info.get(current_patch, {})
@@ -201,15 +209,121 @@ def get_effective_patch() -> str:
 
     return current_patch
 
+
+# --- resolved patch info (memory + disk, TTL bound) ---------------------
+_patch_info: dict | None = None
+_pinned: dict | None = None   # set by pin_patch_info, e.g. from a snapshot bundle
+_refresh_lock = threading.Lock()   # one thread refreshes, the others wait for its answer
+_retry_at = 0.0                    # time.monotonic() before which a failed refresh isn't retried
+
+
+def pin_patch_info(info: dict | None):
+    """ Answer every resolve_patch_info() with ``info`` (None unpins), no network. """
+    global _pinned
+    _pinned = info
+
+
+def _load_patch_info_file() -> dict | None:
+    try:
+        with open(PATCH_INFO_PATH, encoding="utf-8") as f:
+            info = json.load(f)
+        if info.get("latest_patches"):
+            return info
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _is_fresh(info: dict | None) -> bool:
+    return bool(info) and time.time() - info.get("resolved_at", 0) < PATCH_INFO_TTL
+
+
+def _memory_usable() -> bool:
+    """ _patch_info is fresh, or is the stale answer kept after a failed refresh and PATCH_INFO_RETRY isn't up. """
+    return _is_fresh(_patch_info) or (_patch_info is not None and time.monotonic() < _retry_at)
+
+
+def resolve_patch_info(force_refresh: bool = False) -> dict:
+    """
+    Resolve latest patches, their release dates and the effective patch once.
+    The answer is kept in memory and in PATCH_INFO_PATH for PATCH_INFO_TTL,
+    so repeat calls (every champion fetch) don't touch the network.
+
+    {
+        "resolved_at": 1747296398.6,
+        "latest_patches": ["15.10.1", "15.9.1"],
+        "patches": {<estimate_release_dates output>},
+        "effective_patch": "15.9.1",
+        "can_use_latest": False
+    }
+    """
+    global _patch_info
+
+    profiling.count("patch.lookups")
+    if _pinned is not None:
+        return _pinned
+    if not force_refresh:
+        if _memory_usable():
+            return _patch_info
+        on_disk = _load_patch_info_file()
+        if _is_fresh(on_disk):
+            _patch_info = on_disk
+            return _patch_info
+
+    with _refresh_lock:
+        if not force_refresh and _memory_usable():
+            return _patch_info   # another thread just refreshed it (or gave up)
+        with profiling.span("patch.refresh"):
+            return _refresh_patch_info()
+
+
+def _refresh_patch_info() -> dict:
+    """ Ask Data Dragon and the patch schedule again; resolve_patch_info's slow path. """
+    global _patch_info, _retry_at
+
+    latest_patches = get_latest_patches(2)
+    if not latest_patches:
+        # network down - an expired answer beats no answer; keep it for a
+        # while so every champion fetch doesn't wait on retries again
+        _patch_info = _patch_info or _load_patch_info_file() or {
+            "resolved_at": 0, "latest_patches": [], "patches": {},
+            "effective_patch": "", "can_use_latest": False}
+        _retry_at = time.monotonic() + PATCH_INFO_RETRY
+        return _patch_info
+
+    patches = estimate_release_dates(latest_patches)
+    effective_patch = _pick_effective_patch(latest_patches, patches)
+
+    _retry_at = 0.0
+    _patch_info = {
+        "resolved_at": time.time(),
+        "latest_patches": latest_patches,
+        "patches": patches,
+        "effective_patch": effective_patch,
+        "can_use_latest": effective_patch == latest_patches[0],
+    }
+
+    os.makedirs(os.path.dirname(PATCH_INFO_PATH), exist_ok=True)
+    tmp_path = f"{PATCH_INFO_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_patch_info, f, indent=2)
+    os.replace(tmp_path, PATCH_INFO_PATH)
+
+    return _patch_info
+
+
+def get_effective_patch() -> str:
+    return resolve_patch_info()["effective_patch"]
+
+
 def can_use_latest_patch() -> bool:
     """Check if we can use the latest patch (not too new)."""
-    current_patch = get_latest_patches(1)
-    if not current_patch:
-        return False
-    return get_effective_patch() == current_patch[0]
+    return resolve_patch_info()["can_use_latest"]
+
+
 def get_current_patch() -> str:
     """Get the current patch version."""
-    latest_patches = get_latest_patches(1)
+    latest_patches = resolve_patch_info()["latest_patches"]
     if latest_patches:
         return latest_patches[0]
     return ""
@@ -217,7 +331,8 @@ def get_current_patch() -> str:
 
 def main():
     print("Fetching latest League of Legends patches...")
-    latest_patches = get_latest_patches(2)
+    info = resolve_patch_info(force_refresh=True)
+    latest_patches = info["latest_patches"]
 
     if not latest_patches:
         print("Failed to fetch patch information.")
@@ -225,27 +340,16 @@ def main():
 
     print(f"\nFound latest patches: {latest_patches}")
 
-    patch_info = estimate_release_dates(latest_patches)
-    effective_patch = get_effective_patch()
-
     print("\nPatch information:")
-    for ddragon_ver, info in patch_info.items():
+    for ddragon_ver, patch in info["patches"].items():
         print(f"Data Dragon: {ddragon_ver}")
-        print(f"Client Version: {info['client_version']}")
-        print(f"Release Date: {info['release_date']} {'(estimated)' if info['is_estimated'] else ''}")
+        print(f"Client Version: {patch['client_version']}")
+        print(f"Release Date: {patch['release_date']} {'(estimated)' if patch['is_estimated'] else ''}")
         print()
 
-    print(f"\nEffective patch to use: {effective_patch}")
-    print(f"Can use latest patch: {can_use_latest_patch()}")
-    os.makedirs("./cache", exist_ok=True)
-    # Save to file
-    with open("../cache/latest_patches.json", "w") as f:
-        json.dump({
-            "patches": patch_info,
-            "effective_patch": effective_patch,
-            "can_use_latest": can_use_latest_patch()
-        }, f, indent=2)
-    print("\nSaved patch information to latest_patches.json")
+    print(f"\nEffective patch to use: {info['effective_patch']}")
+    print(f"Can use latest patch: {info['can_use_latest']}")
+    print(f"\nSaved patch information to {PATCH_INFO_PATH}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
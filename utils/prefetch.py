@@ -0,0 +1,124 @@
+"""
+Warm the u.gg page cache for every champion x role of the effective patch.
+
+    python -m utils.prefetch                       # everything, defaults below
+    python -m utils.prefetch --roles top,mid --concurrency 4 --rate 2
+    python -m utils.prefetch --rank platinum_plus
+
+Pages already in the cache and younger than CACHE_PERIOD are skipped, so an
+interrupted run picks up where it stopped. A run over every champion also
+builds the role meta table (utils.role_meta) from the warmed pages, so
+champ select never has to.
+"""
+import argparse, asyncio, time
+
+from utils import http_client
+from utils.champion_names import load_champ_name_map
+from utils.fetch_ugg import (HTML_CACHE, CACHE_PERIOD, DEFAULT_RANK, HEADERS, ROLES, get_patch_tag,
+                             purge_superseded, counter_cache_key, counter_page_url)
+from utils.profiling import add_profile_argument, profile_from_args
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 4.0  # requests per second
+
+
+class TokenBucket:
+    """ Allows ``rate`` acquisitions per second on average, bursts up to ``burst``. """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def _fetch_one(slug: str, role: str, patch_tag: str, rank: str,
+                     bucket: TokenBucket, semaphore: asyncio.Semaphore) -> bool:
+    async with semaphore:
+        await bucket.acquire()
+        r = await http_client.async_get(counter_page_url(slug, role, patch_tag, rank), headers=HEADERS)
+        r.raise_for_status()
+    # compress + atomic write off the event loop
+    await asyncio.to_thread(HTML_CACHE.put, counter_cache_key(slug, role, patch_tag, rank),
+                            r.text.encode("utf-8"), patch_tag)
+    return True
+
+
+async def prefetch(slugs: list[str] | None = None,
+                   roles: tuple[str, ...] = ROLES,
+                   concurrency: int = DEFAULT_CONCURRENCY,
+                   rate: float = DEFAULT_RATE,
+                   max_age: float = CACHE_PERIOD,
+                   rank: str = DEFAULT_RANK) -> dict[str, int]:
+    """ Fetch every missing/stale (slug, role) page; returns counts per outcome. """
+    patch_tag = get_patch_tag()
+    purge_superseded(patch_tag)
+    if slugs is None:
+        slugs = sorted(entry["slug"] for entry in load_champ_name_map().values())
+
+    todo = []
+    for slug in slugs:
+        for role in roles:
+            age = HTML_CACHE.age(counter_cache_key(slug, role, patch_tag, rank))
+            if age is None or age >= max_age:
+                todo.append((slug, role))
+
+    stats = {"cached": len(slugs) * len(roles) - len(todo), "fetched": 0, "failed": 0}
+    print(f"patch {patch_tag} ({rank}): {stats['cached']} pages warm, {len(todo)} to fetch")
+
+    bucket = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = {asyncio.create_task(_fetch_one(slug, role, patch_tag, rank, bucket, semaphore)): (slug, role)
+             for slug, role in todo}
+    try:
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            try:
+                await task
+                stats["fetched"] += 1
+            except Exception as e:   # network, disk or anything else - one page, not the crawl
+                stats["failed"] += 1
+                print(f"  failed: {e}")
+            if done % 25 == 0 or done == len(todo):
+                print(f"  {done}/{len(todo)}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await http_client.aclose()
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Warm the u.gg cache for the effective patch")
+    ap.add_argument("--roles", default=",".join(ROLES), help="Comma separated roles")
+    ap.add_argument("--champions", help="Comma separated champion slugs (default: all)")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Requests in flight")
+    ap.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Requests per second")
+    ap.add_argument("--rank", default=DEFAULT_RANK, help=f"u.gg rank filter (default: {DEFAULT_RANK})")
+    add_profile_argument(ap)
+    args = ap.parse_args()
+    profile_from_args(args)
+
+    slugs = args.champions.split(",") if args.champions else None
+    roles = tuple(r.strip() for r in args.roles.split(",") if r.strip())
+    stats = asyncio.run(prefetch(slugs, roles, args.concurrency, args.rate, rank=args.rank))
+    print(f"done: {stats}")
+    if slugs is None:
+        from utils.role_meta import get_role_meta   # numpy, only here
+        get_role_meta(args.rank)
+        print("role meta table ready")
+
+
+if __name__ == "__main__":
+    main()
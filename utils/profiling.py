@@ -0,0 +1,169 @@
+"""
+Opt-in timing spans and counters for the hot paths (network, caches,
+parsing, name resolution).
+
+    python refactor_known_champ_pool_helper.py --enemy darius --profile              # breakdown on stderr
+    python refactor_known_champ_pool_helper.py --enemy darius --profile run.json     # JSON report
+    python refactor_known_champ_pool_helper.py --enemy darius --profile run.trace.json
+                                                    # Chrome trace (chrome://tracing, ui.perfetto.dev)
+
+Disabled (the default) a span is a module flag check plus a shared no-op
+context manager, so the instrumentation can stay in the hot paths.
+"""
+import atexit, contextlib, functools, json, os, sys, threading, time
+
+_enabled = False
+_lock = threading.Lock()
+_spans: list[tuple] = []              # (name, start ns, duration ns, child ns, thread id, args)
+_counters: dict[str, int] = {}
+_local = threading.local()            # per-thread stack of open spans' child time
+_origin = time.perf_counter_ns()
+_NULL = contextlib.nullcontext()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# --- recording ------------------------------------------------------------
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(0)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        stack = _local.stack
+        child = stack.pop()
+        if stack:
+            stack[-1] += duration
+        record(self.name, self.start, duration, child, self.args)
+        return False
+
+    def set(self, **args):
+        """ Attach more args (status, bytes, hit) once they are known. """
+        self.args.update(args)
+
+
+def span(name: str, **args):
+    """ ``with span("ugg.fetch", champ=slug) as s: ... s.set(bytes=n)`` - no-op when disabled. """
+    return _Span(name, args) if _enabled else _NULL
+
+
+def record(name: str, start_ns: int, duration_ns: int, child_ns: int = 0, args: dict | None = None):
+    """ A finished span; for code the span stack can't follow (coroutines sharing a thread). """
+    if _enabled:
+        with _lock:
+            _spans.append((name, start_ns, duration_ns, child_ns, threading.get_ident(), args or {}))
+
+
+def count(name: str, n: int = 1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def profiled(name: str):
+    """ Decorator: the whole call is one span. """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# --- reports --------------------------------------------------------------
+def summary() -> dict:
+    """ {"spans": {name: {calls, total_ms, self_ms, mean_ms, max_ms}}, "counters": {...}} """
+    with _lock:
+        spans, counters = list(_spans), dict(_counters)
+    stats: dict[str, dict] = {}
+    for name, _, duration, child, _, _ in spans:
+        s = stats.setdefault(name, {"calls": 0, "total_ms": 0.0, "self_ms": 0.0, "max_ms": 0.0})
+        s["calls"] += 1
+        s["total_ms"] += duration / 1e6
+        s["self_ms"] += (duration - child) / 1e6
+        s["max_ms"] = max(s["max_ms"], duration / 1e6)
+    for s in stats.values():
+        s["mean_ms"] = s["total_ms"] / s["calls"]
+    return {"wall_ms": (time.perf_counter_ns() - _origin) / 1e6,
+            "spans": dict(sorted(stats.items(), key=lambda kv: -kv[1]["total_ms"])),
+            "counters": dict(sorted(counters.items()))}
+
+
+def format_summary(data: dict | None = None) -> str:
+    data = data or summary()
+    lines = [f"profile: {data['wall_ms']:.1f} ms since start",
+             f"{'span':34} {'calls':>6} {'total ms':>10} {'self ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, s in data["spans"].items():
+        lines.append(f"{name[:34]:34} {s['calls']:6} {s['total_ms']:10.2f} {s['self_ms']:10.2f} "
+                     f"{s['mean_ms']:9.3f} {s['max_ms']:9.2f}")
+    if data["counters"]:
+        lines.append("")
+        lines += [f"{name:34} {value:>10}" for name, value in data["counters"].items()]
+    return "\n".join(lines)
+
+
+def chrome_trace() -> dict:
+    """ Trace Event Format: one complete ("X") event per span, counters as metadata. """
+    with _lock:
+        spans, counters = list(_spans), dict(_counters)
+    pid = os.getpid()
+    events = [{"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+               "ts": (start - _origin) / 1e3, "dur": duration / 1e3, "args": args}
+              for name, start, duration, _, tid, args in spans]
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"counters": counters}}
+
+
+def write_report(target: str | None):
+    """ None/"-": text breakdown on stderr; *.trace.json: Chrome trace; anything else: JSON summary. """
+    if not target or target == "-":
+        print("\n" + format_summary(), file=sys.stderr)
+        return
+    data = chrome_trace() if target.endswith(".trace.json") else summary()
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=None if "traceEvents" in data else 2, default=str)
+    print(f"profile written to {target}", file=sys.stderr)
+
+
+def add_profile_argument(ap):
+    ap.add_argument("--profile", nargs="?", const="-", metavar="FILE",
+                    help="Time network/cache/parse stages; report on stderr, or to FILE "
+                         "(.json summary, .trace.json Chrome trace)")
+
+
+def profile_from_args(args):
+    """ Turn profiling on when --profile was given; the report is written at exit. """
+    if getattr(args, "profile", None):
+        enable()
+        atexit.register(write_report, args.profile)
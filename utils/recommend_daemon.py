@@ -0,0 +1,282 @@
+"""
+Resident recommendation server for the overlay and the Discord bot.
+
+    python -m utils.recommend_daemon                 # http://127.0.0.1:8765
+    python -m utils.recommend_daemon --live          # also follow the client's champ select
+
+    GET /counters?enemy=darius&role=top[&pool=champion_pool.txt][&rank=..][&enemies=a,b,c]
+    GET /bans?champion=garen&role=top[&count=5]
+    GET /bans[?pool=..][&roles=top,mid][&count=5]     # every pool champion + combined
+    GET /draft                                        # live draft (--live)
+    GET /draft?enemies=a,b,c[&lane=a][&allies=d,e][&bans=f,g][&role=top][&pool=..]
+                                                      # lane defaults to the estimated one
+
+``pool=`` names a file in the pool directory (--pool-dir, default: the
+directory of --pool); paths are refused. The alias map, patch, tensors and pool files stay loaded between requests,
+so a warm request is a lookup; expired cache entries are answered at once
+and refreshed in the background (STALE_WHILE_REVALIDATE). Answers are
+JSON; bad input gets a 400 with an ``error``.
+"""
+import argparse, asyncio, json, os, threading, time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from websockets.exceptions import WebSocketException
+
+from utils import fetch_ugg
+from utils.ban_planner import plan_bans
+from utils.batch import BatchRunner, json_number
+from utils.champion_names import load_champ_name_map, get_champ_name_variations
+from utils.draft_engine import DraftEngine, ROW_ERRORS
+from utils.fetch_ugg import ROLES, get_patch_tag, normalize_role
+from utils.http_client import HTTPError
+from utils.lcu import get_lcu_client, LCU_POSITION_TO_ROLE
+from utils.lcu_watcher import ChampSelectDelta, ChampSelectWatcher
+from utils.matchup_tensor import get_tensor, save_tensor
+from utils.parse_ugg_ssr import DEFAULT_RANK
+from utils.profiling import add_profile_argument, profile_from_args
+from utils.role_meta import get_role_meta
+from utils.snapshot import use_snapshot
+
+DEFAULT_PORT = 8765
+SAVE_INTERVAL = 60.0      # seconds between tensor saves while new pages come in
+RECONNECT_DELAY = 5.0     # seconds between attempts to reach the client
+
+
+class RecommendState:
+    """ Everything a request needs, loaded once and reloaded when the patch moves. """
+
+    def __init__(self, role: str = "top", pool: str = "champion_pool.txt", rank: str = DEFAULT_RANK,
+                 pool_dir: str | None = None):
+        self.defaults = {"role": role, "pool": pool, "rank": rank}
+        self.pool_dir = os.path.realpath(pool_dir or os.path.dirname(pool) or ".")
+        self._lock = threading.Lock()
+        self.patch_tag = None
+        self.runner: BatchRunner | None = None
+        self.live: DraftEngine | None = None
+        self.live_session: dict | None = None
+        self._saved_at = time.monotonic()
+        self.refresh()
+
+    def refresh(self):
+        """ New patch -> new alias map and tensors (get_tensor keys them by patch). """
+        patch_tag = get_patch_tag()
+        if patch_tag == self.patch_tag:
+            return
+        with self._lock:
+            if patch_tag != self.patch_tag:
+                self.runner = BatchRunner(load_champ_name_map(), **self.defaults)
+                self.patch_tag = patch_tag
+
+    def maybe_save(self, rank: str):
+        if time.monotonic() - self._saved_at > SAVE_INTERVAL:
+            self._saved_at = time.monotonic()
+            save_tensor(get_tensor(rank))
+
+    def pool_path(self, name: str) -> str:
+        """ Path of pool file ``name``, which must be a plain file name in pool_dir. """
+        path = os.path.realpath(os.path.join(self.pool_dir, name))
+        if os.path.basename(name) != name or os.path.dirname(path) != self.pool_dir:
+            raise ValueError(f"pool must be a file name in {self.pool_dir}")
+        return path
+
+    def champion(self, name: str) -> dict:
+        return get_champ_name_variations(name, self.runner.champ_name_map)
+
+    # --- endpoints -------------------------------------------------------
+    def counters(self, params: dict) -> dict:
+        q = self.runner.normalise(params)
+        result = {"enemy": q["enemy"]["name"], "role": q["role"], "rank": q["rank"], "pool": q["pool"],
+                  "results": self.runner.answer(q)}
+        if q.get("enemies"):
+            result["enemies"] = [e["name"] for e in q["enemies"]]
+            result["scored_enemies"] = self.runner.scored_enemies(q)
+        self.maybe_save(q["rank"])
+        return result
+
+    def bans(self, params: dict) -> dict:
+        rank, count = params.get("rank", self.defaults["rank"]), int(params.get("count", 5))
+        tensor = get_tensor(rank)
+        if params.get("champion"):
+            role = params.get("role", self.defaults["role"])
+            champion = self.champion(params["champion"])
+            plan = plan_bans(tensor, [champion["name"]], (role,), self.runner.use_cache, min_matches=0)
+            self.maybe_save(rank)
+            pick = tensor.registry.index_for_slug(champion["slug"])
+            return {"champion": champion["name"], "role": role, "rank": rank,
+                    "bans": _bans(plan.for_pick(pick, role, count))}
+
+        pool = self.runner.pool(params.get("pool", self.defaults["pool"]))
+        roles = [normalize_role(r) for r in params.get("roles", ",".join(ROLES)).split(",") if r.strip()]
+        plan = plan_bans(tensor, list(pool), roles, self.runner.use_cache)
+        self.maybe_save(rank)
+        return {"rank": rank,
+                "combined": [{"champion": name, "threat": json_number(threat), "threatens": hits}
+                             for name, threat, hits in plan.combined(count)],
+                "per_champion": [{"champion": champ, "role": role, "bans": _bans(bans)}
+                                 for (champ, role), bans in plan.per_pick(count).items()]}
+
+    def draft(self, params: dict) -> dict:
+        if not params.get("enemies"):
+            if self.live is None:
+                raise LookupError("no live draft: start the daemon with --live or pass enemies=")
+            with self._lock:
+                return {"role": self.live.role, "session": self.live_session is not None,
+                        "results": _ranked(self.live.recommend())}
+
+        role = params.get("role", self.defaults["role"])
+        engine = DraftEngine(list(self.runner.pool(params.get("pool", self.defaults["pool"]))), role,
+                             get_tensor(params.get("rank", self.defaults["rank"])),
+                             use_cache=self.runner.use_cache)
+        index = engine.tensor.registry.index_for_slug
+
+        def champs(key: str) -> list[int]:
+            names = [n for n in params.get(key, "").split(",") if n.strip()]
+            return [index(self.champion(n.strip())["slug"]) for n in names]
+
+        for cell, champ in enumerate(champs("enemies")):
+            engine.set_enemy_pick(cell, champ)
+        if params.get("lane"):
+            engine.set_lane_enemy(champs("lane")[0])
+        else:
+            engine.role_meta = get_role_meta(engine.tensor.rank, build=False)   # None: no lane
+            engine.estimate_lane()
+        for cell, champ in enumerate(champs("allies")):
+            engine.set_ally_pick(cell, champ)
+        engine.set_bans(champs("bans"))
+        self.maybe_save(engine.tensor.rank)
+        return {"role": role, "results": _ranked(engine.recommend())}
+
+    # --- live draft ------------------------------------------------------
+    def on_change(self, delta: ChampSelectDelta, session: dict | None):
+        """ Counter pages are loaded before taking the lock, so requests aren't held up by u.gg. """
+        engine = self.live
+        if delta.started or engine is None:
+            engine = DraftEngine(list(self.runner.pool(self.defaults["pool"])), self.defaults["role"],
+                                 get_tensor(self.defaults["rank"]), use_cache=self.runner.use_cache,
+                                 role_meta=get_role_meta(self.defaults["rank"], build=False))
+        _prefetch_rows(engine, delta)
+        with self._lock:
+            self.live = engine
+            for error in engine.apply_delta(delta, session):
+                print(f"live draft: skipped {error}")
+            self.live_session = session
+
+    def follow_client(self):
+        """ Watch champ select for as long as the daemon runs, waiting out client restarts. """
+        while True:
+            try:
+                watcher = ChampSelectWatcher(get_lcu_client().lockfile, self.on_change)
+                asyncio.run(watcher.run())
+            except (OSError, HTTPError, WebSocketException) as e:
+                print(f"live draft: {e}")
+            time.sleep(RECONNECT_DELAY)
+
+
+def _prefetch_rows(engine: DraftEngine, delta: ChampSelectDelta):
+    """ Load the tensor rows ``delta`` will need; apply_delta then only reads them. """
+    role = LCU_POSITION_TO_ROLE.get(delta.assigned_position, engine.role) if delta.assigned_position \
+        else engine.role
+    registry = engine.tensor.registry
+    champs = {registry.index(c) for c in delta.enemy_picks.values() if c}
+    if role != engine.role:
+        champs |= set(engine.enemy_picks.values())
+    for champ in champs - {-1}:
+        try:
+            engine.tensor.ensure({"name": registry.names[champ], "slug": registry.slugs[champ]},
+                                 role, engine.use_cache)
+        except ROW_ERRORS:
+            pass   # apply_delta reports it
+
+
+def _bans(rows: list[tuple[str, float, float, float, int]]) -> list[dict]:
+    return [{"champion": name, "threat": json_number(threat), "wr": json_number(wr),
+             "pickrate": json_number(pickrate), "matches": matches}
+            for name, threat, wr, pickrate, matches in rows]
+
+
+def _ranked(rows: list[tuple[str, float, float, float]]) -> list[dict]:
+    return [{"champion": name, "score": json_number(score), "lane_wr": json_number(lane_wr),
+             "team_wr": json_number(team_wr)} for name, score, lane_wr, team_wr in rows]
+
+
+class RecommendHandler(BaseHTTPRequestHandler):
+    state: RecommendState = None   # set by serve()
+    routes = {"/counters": RecommendState.counters, "/bans": RecommendState.bans,
+              "/draft": RecommendState.draft}
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = self.routes.get(url.path.rstrip("/"))
+        if route is None:
+            return self._send(HTTPStatus.NOT_FOUND, {"error": f"unknown endpoint {url.path}"})
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if "role" in params:
+                params["role"] = normalize_role(params["role"])   # ValueError -> 400
+            if "pool" in params:
+                params["pool"] = self.state.pool_path(params["pool"])
+            self.state.refresh()
+            self._send(HTTPStatus.OK, route(self.state, params))
+        except KeyError as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": f"missing or unknown {e}"})
+        except (ValueError, OSError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except LookupError as e:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+        except (RuntimeError, HTTPError) as e:
+            self._send(HTTPStatus.BAD_GATEWAY, {"error": f"u.gg: {e}"})
+
+    def _send(self, status: HTTPStatus, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass   # the overlay polls, keep the console quiet
+
+
+def serve(state: RecommendState, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    handler = type("Handler", (RecommendHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve counterpick recommendations on localhost")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--role", default="top", choices=ROLES, help="Default role")
+    ap.add_argument("--pool", default="champion_pool.txt", help="Default champion pool file")
+    ap.add_argument("--pool-dir", help="Directory pool= may name files in (default: that of --pool)")
+    ap.add_argument("--rank", default=DEFAULT_RANK, help="Default u.gg rank filter")
+    ap.add_argument("--live", action="store_true", help="Follow champ select in the running client")
+    ap.add_argument("--snapshot", metavar="FILE", help="Serve offline from a snapshot bundle")
+    add_profile_argument(ap)
+    args = ap.parse_args()
+    profile_from_args(args)
+
+    if args.snapshot:
+        use_snapshot(args.snapshot)
+    fetch_ugg.STALE_WHILE_REVALIDATE = True   # resident: refreshes finish long before exit
+
+    state = RecommendState(args.role, args.pool, args.rank, args.pool_dir)
+    if args.live:
+        threading.Thread(target=state.follow_client, daemon=True).start()
+    server = serve(state, port=args.port)
+    print(f"serving on http://127.0.0.1:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        save_tensor(get_tensor(args.rank))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Per-patch role meta: every champion's pick rate and share of games in each
+role, from the rankings block u.gg embeds in every champion page.
+
+    python -m utils.role_meta                 # build (or load) and print the table
+    python -m utils.role_meta --rank platinum_plus
+
+One page per champion is enough since its rankings block covers all five
+roles; pages already in the html cache (any role) are reused. A build that
+missed more than MAX_FAILED_SHARE of the champions is used by that process
+only, never saved, and a stored table is rebuilt after ROLE_META_TTL.
+"""
+import argparse, glob, itertools, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.champion_registry import ChampionRegistry, get_registry
+from utils.fetch_ugg import (CACHE_DIR, CACHE_PERIOD, HTML_CACHE, ROLES, counter_cache_key,
+                             fetch_champ_counter_ugg, get_patch_tag, role_index)
+from utils.parse_ugg_ssr import DEFAULT_RANK, get_rank_and_role_name
+from utils.profiling import add_profile_argument, profile_from_args
+from utils.ssr_document import SSRDocument, SSR_KEY
+
+BUILD_WORKERS = 8
+ROLE_META_TTL = CACHE_PERIOD   # seconds a stored table is trusted
+MAX_FAILED_SHARE = 0.05        # champions a build may miss and still be saved
+MIN_SHARE = 1e-3   # floor for log shares, so off-role picks are unlikely rather than impossible
+ROLE_PERMUTATIONS = np.array(list(itertools.permutations(range(len(ROLES)))), dtype=np.intp)  # (120, 5)
+
+
+class RoleMeta:
+    """
+    ``pickrate[i, r]`` and ``role_matches[i, r]`` for champion index ``i``
+    and ROLES index ``r`` (NaN / 0 where u.gg has nothing).
+    """
+
+    def __init__(self, registry: ChampionRegistry, patch_tag: str, rank: str = DEFAULT_RANK,
+                 pickrate: np.ndarray | None = None, role_matches: np.ndarray | None = None,
+                 built_at: float = 0.0):
+        n = len(registry)
+        self.registry = registry
+        self.patch_tag = patch_tag
+        self.rank = rank
+        self.pickrate = pickrate if pickrate is not None else np.full((n, len(ROLES)), np.nan, np.float32)
+        self.role_matches = role_matches if role_matches is not None else np.zeros((n, len(ROLES)), np.float32)
+        self.built_at = built_at
+
+    @property
+    def shares(self) -> np.ndarray:
+        """ Fraction of each champion's games played in each role (rows sum to 1, or 0). """
+        total = self.role_matches.sum(axis=1, keepdims=True)
+        return np.divide(self.role_matches, total, out=np.zeros_like(self.role_matches), where=total > 0)
+
+    def role_pickrates(self, role: str) -> np.ndarray:
+        """ Pick rate of every champion in ``role``, 0 where unknown. """
+        return np.nan_to_num(self.pickrate[:, role_index(role)])
+
+    def share(self, champ: int, role: str) -> float:
+        return float(self.shares[champ, role_index(role)])
+
+    def main_role(self, champ: int) -> str | None:
+        return ROLES[int(self.role_matches[champ].argmax())] if self.role_matches[champ].any() else None
+
+    # --- building --------------------------------------------------------
+    def set_rankings(self, champ: int, rankings: dict):
+        """ Store one champion's rankings ``data`` dict. """
+        for r, role in enumerate(ROLES):
+            stats = rankings.get(get_rank_and_role_name(role, self.rank), {})
+            self.pickrate[champ, r] = stats.get("pick_rate", np.nan)
+            self.role_matches[champ, r] = stats.get("roleMatches", 0)
+
+    def build(self, use_cache: bool = True, workers: int = BUILD_WORKERS) -> int:
+        """ Fill every champion's row; returns how many couldn't be loaded. """
+        def load(i: int):
+            self.set_rankings(i, parse_rankings(_champion_page(self.registry.slugs[i], self.rank, use_cache),
+                                                self.rank))
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i, future in enumerate([pool.submit(load, i) for i in range(len(self.registry))]):
+                if future.exception() is not None:
+                    failed += 1
+                    print(f"{self.registry.names[i]}: {future.exception()}")
+        self.built_at = time.time()
+        return failed
+
+    # --- persistence -----------------------------------------------------
+    def save(self, path: str):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, pickrate=self.pickrate, role_matches=self.role_matches,
+                 built_at=self.built_at, ids=np.asarray(self.registry.ids))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, registry: ChampionRegistry, patch_tag: str,
+             rank: str = DEFAULT_RANK, max_age: float | None = ROLE_META_TTL) -> "RoleMeta":
+        """ ValueError when the table is for other champions or older than ``max_age`` seconds. """
+        with np.load(path) as f:
+            if not np.array_equal(f["ids"], np.asarray(registry.ids)):
+                raise ValueError("role meta was built for a different champion list")
+            if max_age is not None and time.time() - float(f["built_at"]) > max_age:
+                raise ValueError("role meta is out of date")
+            return cls(registry, patch_tag, rank, f["pickrate"], f["role_matches"], float(f["built_at"]))
+
+
+def parse_rankings(html: str, rank: str = DEFAULT_RANK) -> dict:
+    """ ``data`` of the page's rankings block for ``rank`` (any rank's if that one is missing). """
+    ssr = SSRDocument.from_html(html, SSR_KEY)
+    blocks = dict(ssr.blocks_of_kind("rankings"))
+    for url, block in blocks.items():
+        if url.startswith(f"rankings_{rank}_"):
+            return block.get("data", {})
+    return next(iter(blocks.values()), {}).get("data", {})
+
+
+def _champion_page(slug: str, rank: str = DEFAULT_RANK, use_cache: bool = True) -> str:
+    """ Any cached counter page of ``slug`` in ``rank``, else its default page. """
+    if use_cache:
+        patch_tag = get_patch_tag()
+        for role in (None, *ROLES):
+            cached = HTML_CACHE.get(counter_cache_key(slug, role, patch_tag, rank), max_age=CACHE_PERIOD)
+            if cached is not None:
+                return cached.decode("utf-8")
+    return fetch_champ_counter_ugg(slug, None, use_cache=use_cache, rank=rank)
+
+
+def assign_roles(meta: RoleMeta, champs) -> dict[str, int]:
+    """
+    Most likely role of each of up to five champion indices (one team):
+    the permutation maximising the summed log role shares, found by scoring
+    all 120 at once. Missing picks are padded with rows that fit any role.
+    Returns {role: champion index} for the champions given.
+    """
+    champs = [int(c) for c in champs][:len(ROLES)]
+    logp = np.zeros((len(ROLES), len(ROLES)))
+    logp[:len(champs)] = np.log(np.maximum(meta.shares[champs], MIN_SHARE))
+    scores = logp[np.arange(len(ROLES)), ROLE_PERMUTATIONS].sum(axis=1)
+    best = ROLE_PERMUTATIONS[scores.argmax()]
+    return {ROLES[best[k]]: champ for k, champ in enumerate(champs)}
+
+
+# --- one table per (patch, rank) per process ------------------------------
+_tables: dict[tuple[str, str], RoleMeta] = {}
+_lock = threading.Lock()         # _tables and the files; never held while fetching
+_build_lock = threading.Lock()   # one build at a time
+
+
+def role_meta_path(patch_tag: str, rank: str) -> str:
+    return os.path.join(CACHE_DIR, f"role_meta_{patch_tag}_{rank}.npz")
+
+
+def add_role_meta(table: RoleMeta):
+    """ Make ``table`` the one get_role_meta() returns for its patch and rank. """
+    with _lock:
+        _tables[(table.patch_tag, table.rank)] = table
+
+
+def _stored_role_meta(patch_tag: str, rank: str, max_age: float | None) -> RoleMeta | None:
+    with _lock:
+        table = _tables.get((patch_tag, rank))
+        if table is not None and (max_age is None or time.time() - table.built_at <= max_age):
+            return table   # an older one (e.g. loaded with build=False) gets rebuilt
+        for old in glob.glob(os.path.join(CACHE_DIR, f"role_meta_*_{rank}.npz")):
+            if old != role_meta_path(patch_tag, rank):
+                os.remove(old)
+        try:
+            table = RoleMeta.load(role_meta_path(patch_tag, rank), get_registry(), patch_tag, rank, max_age)
+        except (OSError, ValueError, KeyError):
+            return None
+        _tables[(patch_tag, rank)] = table
+        return table
+
+
+def get_role_meta(rank: str = DEFAULT_RANK, build: bool = True, use_cache: bool = True) -> RoleMeta | None:
+    """
+    Table of the effective patch: memory, then disk, then built. Without
+    ``build`` a stored table of any age is used, else None - building
+    fetches a page per champion, so interactive paths leave it to
+    ``python -m utils.role_meta`` / the prefetch step.
+    """
+    patch_tag = get_patch_tag()
+    table = _stored_role_meta(patch_tag, rank, ROLE_META_TTL if build else None)
+    if table is not None or not build:
+        return table
+
+    with _build_lock:
+        table = _stored_role_meta(patch_tag, rank, ROLE_META_TTL)   # built while we waited?
+        if table is not None:
+            return table
+        table = RoleMeta(get_registry(), patch_tag, rank)
+        failed = table.build(use_cache)
+        if failed > MAX_FAILED_SHARE * len(table.registry):
+            print(f"role meta: {failed} of {len(table.registry)} champions failed to load, not saving it")
+        else:
+            table.save(role_meta_path(patch_tag, rank))
+        add_role_meta(table)
+        return table
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the role meta table of the effective patch")
+    ap.add_argument("--rank", default=DEFAULT_RANK, help="u.gg rank filter")
+    ap.add_argument("--rebuild", action="store_true", help="Ignore the stored table")
+    add_profile_argument(ap)
+    args = ap.parse_args()
+    profile_from_args(args)
+
+    if args.rebuild and os.path.exists(role_meta_path(get_patch_tag(), args.rank)):
+        os.remove(role_meta_path(get_patch_tag(), args.rank))
+    meta = get_role_meta(args.rank)
+    shares = meta.shares
+    print(f"{'champion':16}" + "".join(f"{r:>16}" for r in ROLES))
+    for i in np.argsort(meta.registry.names):
+        cells = "".join(f"{meta.pickrate[i, r]:7.2f}% {shares[i, r]:6.0%} " for r in range(len(ROLES)))
+        print(f"{meta.registry.names[i]:16}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+One-file bundle of a patch's data for offline use.
+
+    python -m utils.snapshot export 15_9.lolsnap             # fills every role first (network/cache)
+    python -m utils.snapshot export 15_9.lolsnap --no-fill   # just what's loaded/cached now
+    python -m utils.snapshot info 15_9.lolsnap
+    python refactor_known_champ_pool_helper.py --snapshot 15_9.lolsnap --enemy darius
+
+Layout: MAGIC, an 8 byte little-endian header length, a JSON header
+(patch info, registry, alias map and index, array directory), then the
+raw arrays (matchup tensor, its load times, role meta), each aligned to
+ALIGN bytes. Opening maps the file and views the arrays in place - no
+copy, no parsing beyond the header - and use_snapshot() installs
+everything so the regular getters answer from it without the network.
+"""
+import argparse, json, mmap, os, struct, time
+
+import numpy as np
+
+from utils.alias_index import AliasIndex
+from utils.champion_names import get_alias_index, load_champ_name_map, pin_alias_map
+from utils.champion_registry import ChampionRegistry, add_registry, get_registry
+from utils.fetch_ugg import ROLES, get_patch_tag
+from utils.matchup_tensor import MatchupTensor, add_tensor, get_tensor, save_tensor
+from utils.parse_ugg_ssr import DEFAULT_RANK
+from utils.patch import pin_patch_info, resolve_patch_info
+from utils.profiling import add_profile_argument, profile_from_args
+from utils.role_meta import RoleMeta, add_role_meta, get_role_meta
+
+MAGIC = b"LOLSNAP\x01"
+ALIGN = 64
+FORMAT_VERSION = 1
+
+
+class Snapshot:
+    def __init__(self, header: dict, arrays: dict[str, np.ndarray], mm: mmap.mmap | None = None):
+        self.header = header
+        self.arrays = arrays
+        self._mm = mm   # keeps the mapping alive as long as the views
+
+        self.patch_info = header["patch_info"]
+        self.patch_tag = header["patch_tag"]
+        self.rank = header["rank"]
+        reg = header["registry"]
+        self.registry = ChampionRegistry(reg["patch"], [tuple(c) for c in reg["champions"]])
+        self.alias_map = header["alias_map"]
+        idx = header["alias_index"]
+        self.alias_index = AliasIndex(idx["aliases"], idx["canonical"], idx["grams"], idx["version"])
+        self.tensor = MatchupTensor(self.registry, self.patch_tag, self.rank,
+                                    arrays["stats"], arrays["loaded_at"], read_only=True)
+        self.role_meta = RoleMeta(self.registry, self.patch_tag, self.rank,
+                                  arrays["pickrate"], arrays["role_matches"], header["role_meta_built_at"])
+
+    @classmethod
+    def open(cls, path: str) -> "Snapshot":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a snapshot bundle")
+        (size,) = struct.unpack_from("<Q", mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(mm[start:start + size])
+        if header.get("format") != FORMAT_VERSION:
+            mm.close()
+            raise ValueError(f"{path}: unsupported snapshot format {header.get('format')}")
+        arrays = {name: np.frombuffer(mm, dtype=a["dtype"], count=int(np.prod(a["shape"])),
+                                      offset=a["offset"]).reshape(a["shape"])
+                  for name, a in header["arrays"].items()}
+        return cls(header, arrays, mm)
+
+    def install(self):
+        """ Make the process wide getters (patch, registry, alias map, tensor, role meta) use this. """
+        pin_patch_info(self.patch_info)
+        add_registry(self.registry)
+        pin_alias_map(self.alias_map, self.alias_index)
+        add_tensor(self.tensor)
+        add_role_meta(self.role_meta)
+
+    def coverage(self) -> dict[str, int]:
+        """ Champions with counter data, per role """
+        return {role: int((self.tensor.loaded_at[r] > 0).sum()) for r, role in enumerate(ROLES)}
+
+
+def use_snapshot(path: str) -> Snapshot:
+    snapshot = Snapshot.open(path)
+    snapshot.install()
+    return snapshot
+
+
+def write_snapshot(path: str, header: dict, arrays: dict[str, np.ndarray]):
+    """ Header JSON plus aligned raw arrays, written to a temp file and swapped in. """
+    directory, offset = {}, 0
+    for name, a in arrays.items():
+        directory[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset += -(-a.nbytes // ALIGN) * ALIGN
+
+    # offsets above are relative to the data section, which starts after the header
+    data_start = ALIGN
+    while True:
+        placed = {name: {**a, "offset": a["offset"] + data_start} for name, a in directory.items()}
+        blob = json.dumps({**header, "format": FORMAT_VERSION, "arrays": placed}).encode()
+        if len(MAGIC) + 8 + len(blob) <= data_start:
+            break
+        data_start = -(-(len(MAGIC) + 8 + len(blob)) // ALIGN) * ALIGN
+    directory = placed
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(blob)) + blob)
+        for name, a in arrays.items():
+            f.seek(directory[name]["offset"])
+            f.write(np.ascontiguousarray(a).tobytes())
+        f.truncate(max(a["offset"] + arrays[n].nbytes for n, a in directory.items()))
+    os.replace(tmp_path, path)
+
+
+def export_snapshot(path: str, rank: str = DEFAULT_RANK, fill: bool = True, use_cache: bool = True):
+    """ Bundle the effective patch; ``fill`` loads every champion's page in every role first. """
+    alias_map = load_champ_name_map()
+    tensor = get_tensor(rank)
+    if fill:
+        for role in ROLES:
+            print(f"loading {role} counter pages...")
+            tensor.ensure_role(role, use_cache)
+        save_tensor(tensor)
+    role_meta = get_role_meta(rank, use_cache=use_cache)
+    index = get_alias_index(alias_map)
+    registry = get_registry()
+
+    header = {
+        "created_at": time.time(),
+        "patch_info": resolve_patch_info(),
+        "patch_tag": get_patch_tag(),
+        "rank": rank,
+        "registry": {"patch": registry.patch,
+                     "champions": list(zip(registry.ids, registry.names, registry.slugs))},
+        "alias_map": alias_map,
+        "alias_index": {"version": index.version, "aliases": index.aliases,
+                        "canonical": index.canonical, "grams": index.grams},
+        "role_meta_built_at": role_meta.built_at,
+    }
+    write_snapshot(path, header, {"stats": tensor.stats, "loaded_at": tensor.loaded_at,
+                                  "pickrate": role_meta.pickrate, "role_matches": role_meta.role_matches})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export or inspect offline snapshot bundles")
+    sub = ap.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Bundle the effective patch into FILE")
+    export.add_argument("file")
+    export.add_argument("--rank", default=DEFAULT_RANK, help="u.gg rank filter")
+    export.add_argument("--no-fill", action="store_true", help="Don't load missing counter pages first")
+    info = sub.add_parser("info", help="Describe a bundle")
+    info.add_argument("file")
+    add_profile_argument(ap)
+    args = ap.parse_args()
+    profile_from_args(args)
+
+    if args.command == "export":
+        export_snapshot(args.file, args.rank, fill=not args.no_fill)
+    snapshot = Snapshot.open(args.file)
+    print(f"{args.file}: patch {snapshot.patch_tag}, rank {snapshot.rank}, "
+          f"{len(snapshot.registry)} champions, {os.path.getsize(args.file) / 1e6:.1f} MB, "
+          f"created {time.strftime('%Y-%m-%d %H:%M', time.localtime(snapshot.header['created_at']))}")
+    print("counter pages per role:", snapshot.coverage())
+
+
+if __name__ == "__main__":
+    main()
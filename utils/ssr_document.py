@@ -0,0 +1,173 @@
+import heapq, json, re
+from collections.abc import Mapping
+
+from utils import profiling
+
+SSR_KEY = "window.__SSR_DATA__"
+
+# Top level SSR keys are the URLs u.gg fetched while rendering, optionally
+# prefixed with a cache name, e.g.
+#   "https://static.bigbrain.gg/assets/lol/riot_static/15.9.1/data/en_US/champion.json"
+#   "rankings_emerald_plus_world::https://stats2.u.gg/lol/1.5/rankings/15_9/ranked_solo_5x5/83/1.5.0.json"
+# and every value is an object, so a top level key is either the first one
+# or follows the closing bracket of the previous value. Nested keys that
+# look the same are told apart by bracket depth.
+_JSON_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_FIRST_KEY = re.compile(r'\{\s*(' + _JSON_STRING + r')\s*:\s*')
+# one pattern per bracket: a literal first character lets re skip ahead
+# far faster than a [}\]] class does
+_KEYS_AFTER_VALUE = tuple(re.compile(re.escape(bracket) + r'\s*,\s*(' + _JSON_STRING + r')\s*:\s*')
+                          for bracket in "}]")
+
+# first match wins, same substrings the parse helpers always searched for
+BLOCK_KINDS = (
+    ("champion", "/champion.json"),
+    ("seo_names", "seo-champion-names"),
+    ("matchups", "matchups"),
+    ("rankings", "rankings"),
+    ("overview", "overview"),
+)
+
+_decoder = json.JSONDecoder()
+
+
+def block_kind(url: str) -> str:
+    for kind, marker in BLOCK_KINDS:
+        if marker in url:
+            return kind
+    return "other"
+
+
+def _depth_change(text: str, start: int, end: int) -> int:
+    """ Brackets opened minus closed in ``text[start:end]``. """
+    return (text.count("{", start, end) + text.count("[", start, end)
+            - text.count("}", start, end) - text.count("]", start, end))
+
+
+def _index_top_level(html: str, start: int, end: int) -> dict[str, int] | None:
+    """
+    key -> offset of its value for the object opening at ``start``, or None
+    when the layout isn't one the index can vouch for. Brackets are counted
+    between keys (never inside a key), so a string holding an unmatched
+    bracket shows up as a total that doesn't close the object.
+    """
+    m = _FIRST_KEY.match(html, start)
+    if m is None or html[m.end():m.end() + 1] not in ("{", "["):
+        return None
+    offsets = {json.loads(m.group(1)): m.end()}
+    depth, pos = 0, m.end()   # depth below the top level object at pos
+    keys = heapq.merge(*(p.finditer(html, pos, end) for p in _KEYS_AFTER_VALUE), key=lambda k: k.start())
+    for m in keys:
+        if m.start() < pos:
+            continue   # starts inside the key just consumed
+        depth += _depth_change(html, pos, m.start() + 1)
+        pos = m.end()
+        if depth:
+            continue   # a key inside some block
+        if html[pos:pos + 1] not in ("{", "["):
+            return None   # a scalar value hides the key after it from the regex
+        offsets[json.loads(m.group(1))] = pos
+    close = html.rfind("}", pos, end)
+    if close == -1 or depth + _depth_change(html, pos, close) != 0:
+        return None
+    return offsets
+
+
+class SSRDocument(Mapping):
+    """
+    Read-only ``url -> block`` view of a page's window.__SSR_DATA__ that only
+    decodes the blocks somebody asks for.
+
+    Building it runs one regex over the page to find where each top level
+    block starts; a block's JSON is decoded with raw_decode on first access
+    and memoised. Pages the index can't be sure about (a top level value
+    that isn't an object or array, brackets that don't add up) are decoded
+    in full instead, so it holds the same items as the plain SSR dict.
+    """
+
+    def __init__(self, text: str, offsets: dict[str, int]):
+        self._text = text
+        self._offsets = offsets                    # url -> offset of its value
+        self._blocks: dict[str, dict] = {}         # decoded so far
+        self._kinds: dict[str, list[str]] = {}
+        for url in offsets:
+            self._kinds.setdefault(block_kind(url), []).append(url)
+
+    @classmethod
+    @profiling.profiled("ssr.index")
+    def from_html(cls, html: str, key: str = SSR_KEY) -> "SSRDocument":
+        start = html.find(key)
+        if start == -1:
+            raise RuntimeError(f"{key} not found")
+
+        start = html.find("{", start)
+        if start == -1:
+            raise RuntimeError(f"No opening brace after {key}")
+
+        # the object can't contain a literal </script>, so it bounds the scan
+        end = html.find("</script>", start)
+        end = len(html) if end == -1 else end
+
+        offsets = _index_top_level(html, start, end)
+        if not offsets:
+            # unknown layout - decode everything and serve it from memory
+            try:
+                ssr, _ = _decoder.raw_decode(html, start)
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"No closing brace found for {key}: {e}") from e
+            return cls.from_dict(ssr)
+
+        return cls(html, offsets)
+
+    @classmethod
+    def from_dict(cls, ssr: dict) -> "SSRDocument":
+        doc = cls("", dict.fromkeys(ssr, -1))
+        doc._blocks.update(ssr)
+        return doc
+
+    # --- Mapping ---------------------------------------------------------
+    def __getitem__(self, url: str):
+        if url in self._blocks:
+            return self._blocks[url]
+        offset = self._offsets[url]                # KeyError for unknown urls
+        with profiling.span("ssr.decode_block", kind=block_kind(url)):
+            block, _ = _decoder.raw_decode(self._text, offset)
+        self._blocks[url] = block
+        return block
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, url):
+        return url in self._offsets
+
+    # --- index lookups ---------------------------------------------------
+    def kind(self, url: str) -> str:
+        return block_kind(url)
+
+    def urls_of_kind(self, kind: str) -> list[str]:
+        return list(self._kinds.get(kind, ()))
+
+    def blocks_of_kind(self, kind: str):
+        """ Decode (lazily) and yield ``(url, block)`` for every block of a kind. """
+        for url in self._kinds.get(kind, ()):
+            yield url, self[url]
+
+    def find(self, part: str) -> str:
+        """ First block URL containing ``part`` - only keys are looked at. """
+        for url in self._offsets:
+            if part in url:
+                return url
+        raise KeyError(f"'{part}' not found in SSR data")
+
+    def subdata(self, part: str):
+        """ ``data`` of the first block whose URL contains ``part``. """
+        block = self[self.find(part)]
+        return block.get("data", {}) if isinstance(block, dict) else {}
+
+    @property
+    def decoded_count(self) -> int:
+        return len(self._blocks)
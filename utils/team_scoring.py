@@ -0,0 +1,122 @@
+import threading
+from concurrent.futures import Future, wait
+
+import numpy as np
+
+from utils.fetch_ugg import role_index
+from utils.matchup_tensor import MatchupTensor, WR, MATCHES
+
+LANE_WEIGHT = 0.6      # share of the score that comes from the lane opponent
+TEAM_WEIGHT = 0.4      # shared by the other enemies
+LATENCY_BUDGET = 3.0   # seconds we wait for cold counter pages
+
+
+def load_enemies(tensor: MatchupTensor, enemies: list[dict], role: str,
+                 budget: float = LATENCY_BUDGET, use_cache: bool = True) -> list[int]:
+    """
+    Make sure every enemy's counter page for ``role`` is in the tensor,
+    fetching cold ones concurrently. Enemies that miss the budget are left
+    out of the result; their fetch keeps going and warms the cache, on a
+    daemon thread so it doesn't hold up interpreter exit.
+    """
+    futures = {_in_daemon_thread(tensor.ensure, enemy, role, use_cache): enemy for enemy in enemies}
+    done, _ = wait(futures, timeout=budget)
+
+    loaded = []
+    for future, enemy in futures.items():
+        if future in done and future.exception() is None:
+            loaded.append(future.result())
+        elif future in done:
+            print(f"Could not load {enemy['name']}: {future.exception()}")
+        else:
+            print(f"{enemy['name']} did not load within {budget:.1f}s, scoring without them")
+    return loaded
+
+
+def _in_daemon_thread(fn, *args) -> Future:
+    """ ``fn(*args)`` on its own daemon thread (ThreadPoolExecutor workers are joined at exit). """
+    future = Future()
+
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def available(pool: np.ndarray, enemies: list[int]) -> np.ndarray:
+    """ ``pool`` without the champions the enemy team has already picked. """
+    pool = np.asarray(pool, dtype=np.intp)
+    return pool[~np.isin(pool, np.asarray(enemies, dtype=np.intp))]
+
+
+def scored_enemies(tensor: MatchupTensor, pool: np.ndarray, enemies: list[int], role: str,
+                   lane_enemy: int | None = None) -> list[int]:
+    """
+    The non-lane ``enemies`` whose ``role`` counter page has data for at
+    least one pool champion, i.e. the ones the team part of the score is
+    actually built from. An enemy jungler or support rarely shows up on our
+    lane's pages, so this is often fewer than asked for.
+    """
+    enemies = [e for e in enemies if e != lane_enemy]
+    pool = available(pool, enemies + ([] if lane_enemy is None else [lane_enemy]))
+    wr = tensor.stats[WR, role_index(role)][np.ix_(np.asarray(enemies, dtype=np.intp), pool)]
+    return [e for e, row in zip(enemies, wr) if (~np.isnan(row)).any()]
+
+
+def combine_scores(lane_wr: np.ndarray, team_sum: np.ndarray, team_cnt: np.ndarray, others: int,
+                   lane_weight: float = LANE_WEIGHT, team_weight: float = TEAM_WEIGHT) -> np.ndarray:
+    """
+    Weighted win rate per pool champion from its partial sums: ``lane_wr``
+    (NaN when unknown) and the sum/count of its known win rates against the
+    ``others`` non-lane enemies, each of which weighs team_weight / others.
+    NaN where there is no data at all.
+    """
+    has_lane = ~np.isnan(lane_wr)
+    per_enemy = team_weight / max(1, others)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return ((np.where(has_lane, lane_wr, 0.0) * lane_weight + team_sum * per_enemy)
+                / (has_lane * lane_weight + team_cnt * per_enemy))
+
+
+def score_pool_vs_team(tensor: MatchupTensor, pool: np.ndarray, enemies: list[int], role: str,
+                       lane_enemy: int | None = None,
+                       lane_weight: float = LANE_WEIGHT,
+                       team_weight: float = TEAM_WEIGHT) -> list[tuple[str, float, float, float, int]]:
+    """
+    Score every pool champion against the whole enemy team in one pass.
+
+    Each enemy contributes our win rate against them from their ``role``
+    counter page (the head-to-head u.gg has for our position). The lane
+    opponent gets ``lane_weight``, the others split ``team_weight``; missing
+    matchups are left out and the weights renormalised per champion (see
+    scored_enemies for which enemies that leaves).
+
+    Pool champions the enemy already picked are not ranked. Returns
+    [(name, score, lane wr, team wr, matches), ...] best first, where score
+    is the weighted win rate.
+    """
+    pool = available(pool, list(enemies) + ([] if lane_enemy is None else [lane_enemy]))
+    enemies = np.asarray(enemies, dtype=np.intp)
+    wr = tensor.stats[WR, role_index(role)][np.ix_(enemies, pool)]          # (enemies, pool)
+    matches = tensor.stats[MATCHES, role_index(role)][np.ix_(enemies, pool)]
+
+    is_lane = enemies == lane_enemy if lane_enemy is not None else np.zeros(len(enemies), bool)
+    lane_wr = wr[is_lane.argmax()] if is_lane.any() else np.full(len(pool), np.nan)
+    team = ~np.isnan(wr) & ~is_lane[:, None]
+    team_sum = np.where(team, wr, 0.0).sum(axis=0)
+    team_cnt = team.sum(axis=0)
+
+    score = combine_scores(lane_wr, team_sum, team_cnt, int((~is_lane).sum()), lane_weight, team_weight)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        team_wr = team_sum / team_cnt
+    sample = np.nansum(matches, axis=0).astype(int)
+
+    order = [i for i in np.argsort(-np.nan_to_num(score, nan=-np.inf), kind="stable")
+             if not np.isnan(score[i])]
+    return [(tensor.registry.names[pool[i]], float(score[i]), float(lane_wr[i]),
+             float(team_wr[i]), int(sample[i])) for i in order]